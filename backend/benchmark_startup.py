@@ -0,0 +1,68 @@
+"""Measure how long the API takes to import and to start.
+
+    python benchmark_startup.py [--runs 5]
+
+Import time is measured in fresh interpreters. Startup time runs the app's
+lifespan (index builds, admin seeding, connection warm-up) against MONGO_URL
+using a throwaway database, and is skipped when MONGO_URL is not set.
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+BACKEND_DIR = Path(__file__).parent
+
+IMPORT_SNIPPET = (
+    "import time; started = time.perf_counter(); import server; "
+    "print(time.perf_counter() - started)"
+)
+
+def measure_import(runs: int) -> list:
+    timings = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", IMPORT_SNIPPET],
+            cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+        ).stdout
+        timings.append(float(output.strip().splitlines()[-1]))
+    return timings
+
+async def measure_startup(runs: int) -> list:
+    sys.path.insert(0, str(BACKEND_DIR))
+    import server
+
+    timings = []
+    for run in range(runs):
+        settings = server.Settings(db_name=f"ehsas_startup_bench_{os.getpid()}_{run}", background_jobs=False)
+        app = server.create_app(settings)
+        started = time.perf_counter()
+        async with app.router.lifespan_context(app):
+            timings.append(time.perf_counter() - started)
+            await app.state.runtime.mongo.client.drop_database(settings.db_name)
+    return timings
+
+def report(name: str, timings: list):
+    print(f"{name:<8} median {statistics.median(timings) * 1000:7.1f} ms   "
+          f"min {min(timings) * 1000:7.1f} ms   max {max(timings) * 1000:7.1f} ms   ({len(timings)} runs)")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+    load_dotenv(BACKEND_DIR / ".env")
+
+    report("import", measure_import(args.runs))
+    if os.environ.get("MONGO_URL"):
+        report("startup", asyncio.run(measure_startup(args.runs)))
+    else:
+        print("startup  skipped: MONGO_URL is not set")
+
+if __name__ == "__main__":
+    main()
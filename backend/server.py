@@ -1,28 +1,146 @@
-from fastapi import FastAPI, APIRouter, HTTPException, Depends, status
+from fastapi import FastAPI, APIRouter, HTTPException, Depends, Header, Query, Request, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import FileResponse, JSONResponse, Response
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from dotenv import load_dotenv
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
 from starlette.middleware.cors import CORSMiddleware
-from motor.motor_asyncio import AsyncIOMotorClient
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorClientSession
+from python_multipart.multipart import MultipartParser, parse_options_header
+from concurrent.futures import ProcessPoolExecutor
+import asyncio
+import base64
+import bson
+from bson import json_util
+import contextlib
+import functools
+import hashlib
 import os
+import re
+import socket
+import tempfile
+import gzip
 import logging
 from pathlib import Path
-from pydantic import BaseModel, Field, EmailStr, ConfigDict
-from typing import List, Optional
+from pydantic import BaseModel, Field, EmailStr, ConfigDict, TypeAdapter
+from pymongo import ReplaceOne, ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+from pymongo.read_concern import ReadConcern
+from pymongo.read_preferences import SecondaryPreferred
+from contextvars import ContextVar
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlencode
+import math
+import time
 import uuid
-from datetime import datetime, timezone, timedelta
+from datetime import date, datetime, timezone, timedelta
+from difflib import SequenceMatcher
+from zoneinfo import ZoneInfo
 import jwt
 import bcrypt
 import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
 # MongoDB connection
-mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ['DB_NAME']]
+# Nothing connects at import time. Each app built by create_app() owns an
+# AppRuntime whose Motor client is created on first use; the module-level
+# `client`, `db`, `replica_db` and `causal_db` forward to the runtime of the
+# app serving the current request (or the default app outside one).
+
+# Read routing: mutations use `db` (primary). Public, staleness-tolerant reads use
+# `replica_db`; admin reads use `causal_db` inside a causally consistent session.
+# On a standalone server both simply read from the primary.
+READ_MAX_STALENESS_SECONDS = int(os.environ.get('READ_MAX_STALENESS_SECONDS', 90))  # driver minimum is 90
+
+class Settings(BaseModel):
+    """Per-app settings; the rest of the configuration is read from the environment below"""
+    mongo_url: Optional[str] = Field(default_factory=lambda: os.environ.get('MONGO_URL'))
+    db_name: Optional[str] = Field(default_factory=lambda: os.environ.get('DB_NAME'))
+    cors_origins: List[str] = Field(default_factory=lambda: os.environ.get('CORS_ORIGINS', '*').split(','))
+    # Archive scheduler, admin digest and data migrations; tests usually turn these off
+    background_jobs: bool = True
+    seed_admin: bool = True
+
+class MongoConnection:
+    """Motor client and database handles for one app, created on first use"""
+    
+    def __init__(self, settings: Settings):
+        self.settings = settings
+        self._client: Optional[AsyncIOMotorClient] = None
+    
+    @property
+    def client(self) -> AsyncIOMotorClient:
+        if self._client is None:
+            if not (self.settings.mongo_url and self.settings.db_name):
+                raise RuntimeError("MONGO_URL and DB_NAME must be set")
+            # tz_aware so stored dates come back as UTC-aware datetimes
+            self._client = AsyncIOMotorClient(self.settings.mongo_url, tz_aware=True)
+        return self._client
+    
+    @functools.cached_property
+    def db(self):
+        return self.client[self.settings.db_name]
+    
+    @functools.cached_property
+    def replica_db(self):
+        return self.client.get_database(
+            self.settings.db_name,
+            read_preference=SecondaryPreferred(max_staleness=READ_MAX_STALENESS_SECONDS)
+        )
+    
+    @functools.cached_property
+    def causal_db(self):
+        return self.client.get_database(
+            self.settings.db_name,
+            read_preference=SecondaryPreferred(max_staleness=READ_MAX_STALENESS_SECONDS),
+            read_concern=ReadConcern("majority")
+        )
+    
+    def close(self):
+        """Close the client; the next use reconnects, so a restarted app gets a fresh one"""
+        if self._client is not None:
+            self._client.close()
+        self._client = None
+        for name in ("db", "replica_db", "causal_db"):
+            self.__dict__.pop(name, None)
+
+class ContextProxy:
+    """Module-level stand-in that forwards to an object owned by the current app runtime"""
+    
+    def __init__(self, resolve: Callable):
+        object.__setattr__(self, "_resolve", resolve)
+    
+    def __getattr__(self, name):
+        return getattr(self._resolve(), name)
+    
+    def __setattr__(self, name, value):
+        setattr(self._resolve(), name, value)
+    
+    def __getitem__(self, key):
+        return self._resolve()[key]
+
+current_runtime: ContextVar = ContextVar("current_runtime")
+
+def get_runtime() -> "AppRuntime":
+    try:
+        return current_runtime.get()
+    except LookupError:
+        return get_default_app().state.runtime
+
+client = ContextProxy(lambda: get_runtime().mongo.client)
+db = ContextProxy(lambda: get_runtime().mongo.db)
+replica_db = ContextProxy(lambda: get_runtime().mongo.replica_db)
+causal_db = ContextProxy(lambda: get_runtime().mongo.causal_db)
 
 # JWT Settings
 JWT_SECRET = os.environ.get('JWT_SECRET', 'ehsas-super-secret-key-2024')
@@ -37,10 +155,91 @@ SMTP_PASSWORD = os.environ.get('SMTP_PASSWORD', '')
 SMTP_FROM_EMAIL = os.environ.get('SMTP_FROM_EMAIL', 'ehsas@eldenheights.org')
 SMTP_FROM_NAME = os.environ.get('SMTP_FROM_NAME', 'EHSAS - Elden Heights School Alumni Society')
 
+# Admin Notification Settings
+# "immediate" emails the admin on every registration; "digest" batches them
+ADMIN_EMAIL_MODE = os.environ.get('ADMIN_EMAIL_MODE', 'digest').lower()
+DIGEST_INTERVAL_MINUTES = int(os.environ.get('DIGEST_INTERVAL_MINUTES', 30))
+DIGEST_MAX_REGISTRATIONS = int(os.environ.get('DIGEST_MAX_REGISTRATIONS', 25))
+
+# Events Settings
+# Event dates and times are entered in the school's local time
+EVENT_TIMEZONE = ZoneInfo(os.environ.get('EVENT_TIMEZONE', 'Asia/Kolkata'))
+
+# Analytics Settings
+# Daily rollups bucket activity by calendar day in this timezone
+ANALYTICS_TIMEZONE = ZoneInfo(os.environ.get('ANALYTICS_TIMEZONE', os.environ.get('EVENT_TIMEZONE', 'Asia/Kolkata')))
+
+# Upload Settings
+UPLOAD_DIR = Path(os.environ.get('UPLOAD_DIR', ROOT_DIR / 'uploads'))
+UPLOAD_MAX_BYTES = int(os.environ.get('UPLOAD_MAX_BYTES', 10 * 1024 * 1024))
+IMAGE_MAX_DIMENSION = int(os.environ.get('IMAGE_MAX_DIMENSION', 1600))
+THUMBNAIL_DIMENSION = int(os.environ.get('THUMBNAIL_DIMENSION', 400))
+IMAGE_WORKERS = int(os.environ.get('IMAGE_WORKERS', 2))
+
+# Rate Limiting Settings
+# Limits are written as "<requests>/<second|minute|hour|day>"
+RATE_LIMIT_BACKEND = os.environ.get('RATE_LIMIT_BACKEND', 'memory')  # memory, mongo
+# Only enable behind a proxy that sets X-Forwarded-For itself; otherwise clients can
+# pick a fresh per-IP bucket on every request by sending their own header
+RATE_LIMIT_TRUST_FORWARDED = os.environ.get('RATE_LIMIT_TRUST_FORWARDED', 'false').lower() == 'true'
+REGISTER_RATE_PER_IP = os.environ.get('REGISTER_RATE_PER_IP', '10/hour')
+REGISTER_RATE_PER_EMAIL = os.environ.get('REGISTER_RATE_PER_EMAIL', '3/hour')
+LOGIN_RATE_PER_IP = os.environ.get('LOGIN_RATE_PER_IP', '30/minute')
+LOGIN_RATE_PER_EMAIL = os.environ.get('LOGIN_RATE_PER_EMAIL', '5/minute')
+EXPENSIVE_CONCURRENCY_LIMIT = int(os.environ.get('EXPENSIVE_CONCURRENCY_LIMIT', 8))
+EXPENSIVE_QUEUE_TIMEOUT = float(os.environ.get('EXPENSIVE_QUEUE_TIMEOUT', 2))
+
+# Compression Settings
+COMPRESSION_MIN_SIZE = int(os.environ.get('COMPRESSION_MIN_SIZE', 1024))
+GZIP_LEVEL = int(os.environ.get('GZIP_LEVEL', 6))
+BROTLI_QUALITY = int(os.environ.get('BROTLI_QUALITY', 5))
+
+# Idempotency Settings
+IDEMPOTENCY_KEY_TTL_HOURS = int(os.environ.get('IDEMPOTENCY_KEY_TTL_HOURS', 24))
+# How long an in-progress request holds its key before a retry may take it over
+IDEMPOTENCY_LOCK_SECONDS = int(os.environ.get('IDEMPOTENCY_LOCK_SECONDS', 60))
+# How long an approval holds a registration while it assigns the EHSAS ID
+APPROVAL_CLAIM_SECONDS = int(os.environ.get('APPROVAL_CLAIM_SECONDS', 60))
+
+# Duplicate Detection Settings
+DEFAULT_COUNTRY_CODE = os.environ.get('DEFAULT_COUNTRY_CODE', '91')
+DUPLICATE_SCORE_THRESHOLD = float(os.environ.get('DUPLICATE_SCORE_THRESHOLD', 0.45))
+
+# Archival Settings
+ARCHIVE_ENABLED = os.environ.get('ARCHIVE_ENABLED', 'true').lower() == 'true'
+ARCHIVE_INTERVAL_MINUTES = int(os.environ.get('ARCHIVE_INTERVAL_MINUTES', 60))
+ARCHIVE_REJECTED_AFTER_DAYS = int(os.environ.get('ARCHIVE_REJECTED_AFTER_DAYS', 30))
+ARCHIVE_READ_NOTIFICATIONS_AFTER_DAYS = int(os.environ.get('ARCHIVE_READ_NOTIFICATIONS_AFTER_DAYS', 7))
+ARCHIVE_BATCH_SIZE = int(os.environ.get('ARCHIVE_BATCH_SIZE', 500))
+ARCHIVE_MAX_DOCS_PER_SECOND = float(os.environ.get('ARCHIVE_MAX_DOCS_PER_SECOND', 200))
+
+# Audit Settings
+AUDIT_QUEUE_SIZE = int(os.environ.get('AUDIT_QUEUE_SIZE', 10000))
+AUDIT_BATCH_SIZE = int(os.environ.get('AUDIT_BATCH_SIZE', 200))
+AUDIT_FLUSH_INTERVAL_SECONDS = float(os.environ.get('AUDIT_FLUSH_INTERVAL_SECONDS', 2))
+
+# Delta Sync Settings
+TOMBSTONE_RETENTION_DAYS = int(os.environ.get('TOMBSTONE_RETENTION_DAYS', 30))
+# Cursors are handed out this far in the past to absorb clock skew between app and database servers
+DELTA_SYNC_OVERLAP_SECONDS = int(os.environ.get('DELTA_SYNC_OVERLAP_SECONDS', 5))
+# A delta with more changes than this is replaced by a full snapshot (capped the same way)
+DELTA_SYNC_MAX_ROWS = int(os.environ.get('DELTA_SYNC_MAX_ROWS', 1000))
+
+# Migration Settings
+MIGRATION_BATCH_SIZE = int(os.environ.get('MIGRATION_BATCH_SIZE', 500))
+
+# Lifecycle Settings
+# How long shutdown waits for background work before cancelling it
+SHUTDOWN_DRAIN_SECONDS = float(os.environ.get('SHUTDOWN_DRAIN_SECONDS', 20))
+# Buffered work that cannot reach Mongo at shutdown is written here and reloaded on startup
+SPILL_DIR = Path(os.environ.get('SPILL_DIR', ROOT_DIR / 'spill'))
+
+# Identifies this worker when holding background job leases
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}"
+
 # Security
 security = HTTPBearer()
 
-app = FastAPI()
 api_router = APIRouter(prefix="/api")
 
 # =============================================================================
@@ -75,6 +274,14 @@ class AlumniRegistration(BaseModel):
     profession: Optional[str] = ""
     organization: Optional[str] = ""
 
+class DuplicateMatch(BaseModel):
+    id: str
+    name: str
+    email: str
+    status: str
+    score: float
+    reasons: List[str]
+
 class Alumni(BaseModel):
     model_config = ConfigDict(extra="ignore")
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
@@ -94,9 +301,12 @@ class Alumni(BaseModel):
     country: str
     profession: str = ""
     organization: str = ""
-    status: str = "pending"  # pending, approved, rejected
+    status: str = "pending"  # pending, approving (while the EHSAS ID is assigned), approved, rejected
     ehsas_id: Optional[str] = None
+    duplicate_keys: List[str] = []
+    possible_duplicates: List[DuplicateMatch] = []
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     approved_at: Optional[datetime] = None
 
 class AlumniResponse(BaseModel):
@@ -118,8 +328,12 @@ class AlumniResponse(BaseModel):
     organization: str
     status: str
     ehsas_id: Optional[str]
-    created_at: str
-    approved_at: Optional[str]
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+    approved_at: Optional[datetime] = None
+
+class PendingAlumniResponse(AlumniResponse):
+    possible_duplicates: List[DuplicateMatch] = []
 
 class Event(BaseModel):
     model_config = ConfigDict(extra="ignore")
@@ -129,10 +343,15 @@ class Event(BaseModel):
     event_type: str  # reunion, webinar, campus, meetup
     date: str
     time: str
+    start_at: Optional[datetime] = None  # UTC, parsed from date and time
     location: str
     image_url: Optional[str] = ""
+    capacity: Optional[int] = None  # None means unlimited seats
+    registered_count: int = 0
+    waitlist_count: int = 0
     is_active: bool = True
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
 class EventCreate(BaseModel):
     title: str
@@ -142,6 +361,27 @@ class EventCreate(BaseModel):
     time: str
     location: str
     image_url: Optional[str] = ""
+    capacity: Optional[int] = Field(default=None, ge=1)
+
+class EventRSVPCreate(BaseModel):
+    name: str
+    email: EmailStr
+
+class EventRSVP(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    event_id: str
+    name: str
+    email: str
+    status: str = "confirmed"  # confirmed, waitlisted, cancelled
+    waitlist_number: Optional[int] = None
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+class EventRSVPStatus(BaseModel):
+    """What a repeated RSVP gets back; the RSVP id is what cancels a seat, so it is left out"""
+    event_id: str
+    status: str
+    waitlist_number: Optional[int] = None
 
 class Notification(BaseModel):
     model_config = ConfigDict(extra="ignore")
@@ -151,6 +391,7 @@ class Notification(BaseModel):
     message: str
     alumni_id: Optional[str] = None
     is_read: bool = False
+    emailed: bool = False
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
 class SpotlightAlumni(BaseModel):
@@ -163,6 +404,7 @@ class SpotlightAlumni(BaseModel):
     category: str  # founder, doctor, civil_servant, creator, corporate
     image_url: Optional[str] = ""
     is_featured: bool = True
+    updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
 # =============================================================================
 # HELPER FUNCTIONS
@@ -196,6 +438,49 @@ def generate_ehsas_id(year_of_leaving: int, count: int) -> str:
     year_suffix = str(year_of_leaving)[-2:]
     return f"EH{year_suffix}{str(count).zfill(4)}"
 
+EVENT_DATE_FORMATS = ["%Y-%m-%d", "%d-%m-%Y", "%d/%m/%Y", "%d %B %Y", "%d %b %Y", "%B %d, %Y", "%b %d, %Y"]
+EVENT_TIME_FORMATS = ["%I:%M %p", "%I:%M%p", "%I %p", "%I%p", "%H:%M"]
+
+def parse_event_start(date: str, time_of_day: str) -> Optional[datetime]:
+    """Combine free-form event date and time strings into a UTC datetime.
+
+    Returns None when the date cannot be parsed; an unparseable time falls back
+    to the start of the day.
+    """
+    day = None
+    for fmt in EVENT_DATE_FORMATS:
+        try:
+            day = datetime.strptime(date.strip(), fmt)
+            break
+        except ValueError:
+            continue
+    if day is None:
+        return None
+
+    for fmt in EVENT_TIME_FORMATS:
+        try:
+            clock = datetime.strptime(time_of_day.strip().upper(), fmt)
+            day = day.replace(hour=clock.hour, minute=clock.minute)
+            break
+        except ValueError:
+            continue
+    return day.replace(tzinfo=EVENT_TIMEZONE).astimezone(timezone.utc)
+
+def as_utc(value: datetime) -> datetime:
+    """Normalise to UTC, treating naive datetimes (query parameters, legacy ISO strings) as UTC"""
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+def list_response(items: list, response_format: str):
+    """Return items as-is, or as {"fields": [...], "rows": [[...]]} for the columnar format"""
+    if response_format != "columnar":
+        return items
+    records = jsonable_encoder(items)
+    fields = list(records[0].keys()) if records else []
+    return JSONResponse({
+        "fields": fields,
+        "rows": [[record.get(field) for field in fields] for record in records],
+    })
+
 def hash_password(password: str) -> str:
     return bcrypt.hashpw(password.encode(), bcrypt.gensalt()).decode()
 
@@ -251,7 +536,37 @@ def send_registration_notification(alumni_data: dict):
     </body>
     </html>
     """
-    send_email(SMTP_FROM_EMAIL, subject, html_content)
+    return send_email(SMTP_FROM_EMAIL, subject, html_content)
+
+def send_registration_digest(registrations: List[dict]):
+    """Send the admin a single email listing several new registrations"""
+    subject = f"{len(registrations)} New Alumni Registration{'s' if len(registrations) != 1 else ''}"
+    rows = "".join(
+        f"""<tr><td style="padding: 8px 0; border-bottom: 1px solid #E8E0D0;">{a['first_name']} {a['last_name']}<br><span style="font-size: 12px; opacity: 0.7;">{a['email']} &middot; {a['mobile']}</span></td><td style="padding: 8px 0; border-bottom: 1px solid #E8E0D0;">{a['year_of_joining']} - {a['year_of_leaving']}</td><td style="padding: 8px 0; border-bottom: 1px solid #E8E0D0;">{a['city']}, {a['country']}</td></tr>"""
+        for a in registrations
+    )
+    html_content = f"""
+    <html>
+    <body style="font-family: 'Segoe UI', Arial, sans-serif; color: #2D2D2D; max-width: 600px; margin: 0 auto;">
+        <div style="background: #8B1C3A; padding: 30px; text-align: center;">
+            <h1 style="color: white; margin: 0; font-size: 28px;">EHSAS</h1>
+            <p style="color: #C9A227; margin: 10px 0 0 0; font-size: 14px;">Registration Digest</p>
+        </div>
+        <div style="padding: 30px; background: #FAF8F3;">
+            <h2 style="color: #8B1C3A; margin-top: 0;">{len(registrations)} new registration{'s' if len(registrations) != 1 else ''}</h2>
+            <table style="width: 100%; border-collapse: collapse;">
+                <tr><th style="text-align: left; padding: 8px 0;">Name</th><th style="text-align: left; padding: 8px 0;">Batch</th><th style="text-align: left; padding: 8px 0;">City</th></tr>
+                {rows}
+            </table>
+            <p style="margin-top: 20px;">Please login to the admin panel to approve or reject these registrations.</p>
+        </div>
+        <div style="background: #6B0F2A; padding: 20px; text-align: center;">
+            <p style="color: white; opacity: 0.7; margin: 0; font-size: 12px;">EHSAS - Elden Heights School Alumni Society</p>
+        </div>
+    </body>
+    </html>
+    """
+    return send_email(SMTP_FROM_EMAIL, subject, html_content)
 
 def send_approval_email(alumni_data: dict, ehsas_id: str):
     """Send approval email to alumni with their EHSAS ID"""
@@ -321,17 +636,614 @@ def send_rejection_email(alumni_data: dict):
     """
     return send_email(alumni_data['email'], subject, html_content)
 
+# =============================================================================
+# RATE LIMITING
+# =============================================================================
+
+RATE_PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+def parse_rate(rate: str) -> Tuple[float, float]:
+    """Parse "10/hour" into a (capacity, refill tokens per second) pair"""
+    count, period = rate.split("/")
+    capacity = float(count)
+    return capacity, capacity / RATE_PERIODS[period.strip()]
+
+def client_ip(request: Request) -> str:
+    # Behind the ingress the real client is the last hop it appended
+    forwarded = request.headers.get("x-forwarded-for")
+    if RATE_LIMIT_TRUST_FORWARDED and forwarded:
+        return forwarded.split(",")[-1].strip()
+    return request.client.host if request.client else "unknown"
+
+class MemoryTokenBucketStore:
+    """Token buckets kept in process memory; limits apply per worker"""
+
+    PRUNE_THRESHOLD = 10000
+
+    def __init__(self):
+        # key -> (tokens, last update, time at which the bucket is full again)
+        self.buckets: Dict[str, Tuple[float, float, float]] = {}
+
+    async def take(self, key: str, capacity: float, refill_rate: float) -> float:
+        """Take one token, returning 0 on success or the seconds until one is available"""
+        now = time.monotonic()
+        tokens, updated, _ = self.buckets.get(key, (capacity, now, now))
+        tokens = min(capacity, tokens + (now - updated) * refill_rate)
+        if len(self.buckets) > self.PRUNE_THRESHOLD:
+            # Buckets that have refilled completely carry no state
+            self.buckets = {k: v for k, v in self.buckets.items() if v[2] > now}
+
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+        self.buckets[key] = (tokens, now, now + (capacity - tokens) / refill_rate)
+        return 0.0 if allowed else (1 - tokens) / refill_rate
+
+class MongoTokenBucketStore:
+    """Token buckets shared by every worker through the rate_limits collection"""
+
+    async def take(self, key: str, capacity: float, refill_rate: float) -> float:
+        now = time.time()
+        refilled = {"$min": [capacity, {"$add": [
+            {"$ifNull": ["$tokens", capacity]},
+            {"$multiply": [{"$subtract": [now, {"$ifNull": ["$updated", now]}]}, refill_rate]},
+        ]}]}
+        # Refill and take in a single atomic pipeline update so concurrent workers never double-spend
+        bucket = await db.rate_limits.find_one_and_update(
+            {"_id": key},
+            [
+                {"$set": {"tokens": refilled, "updated": now}},
+                {"$set": {
+                    "allowed": {"$gte": ["$tokens", 1]},
+                    "tokens": {"$cond": [{"$gte": ["$tokens", 1]}, {"$subtract": ["$tokens", 1]}, "$tokens"]},
+                    "expires_at": {"$add": ["$$NOW", int(capacity / refill_rate * 1000)]},
+                }},
+            ],
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+        if bucket["allowed"]:
+            return 0.0
+        return (1 - bucket["tokens"]) / refill_rate
+
+rate_limit_store = ContextProxy(lambda: get_runtime().rate_limit_store)
+
+async def enforce_rate_limits(scope: str, limits: List[Tuple[str, str, str]]):
+    """Check (kind, identity, rate) limits in order and raise 429 on the first exhausted bucket"""
+    for kind, identity, rate in limits:
+        capacity, refill_rate = parse_rate(rate)
+        retry_after = await rate_limit_store.take(f"{scope}:{kind}:{identity}", capacity, refill_rate)
+        if retry_after > 0:
+            raise HTTPException(
+                status_code=429,
+                detail="Too many requests. Please try again later.",
+                headers={"Retry-After": str(math.ceil(retry_after))},
+            )
+
+class ConcurrencyLimiter:
+    """Caps how many expensive handlers run at once and sheds the excess with 503"""
+
+    def __init__(self, limit: int, queue_timeout: float):
+        self.semaphore = asyncio.Semaphore(limit)
+        self.queue_timeout = queue_timeout
+
+    @contextlib.asynccontextmanager
+    async def slot(self):
+        try:
+            await asyncio.wait_for(self.semaphore.acquire(), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            raise HTTPException(
+                status_code=503,
+                detail="Server is busy. Please try again shortly.",
+                headers={"Retry-After": str(max(1, math.ceil(self.queue_timeout)))},
+            )
+        try:
+            yield
+        finally:
+            self.semaphore.release()
+
+expensive_handlers = ContextProxy(lambda: get_runtime().expensive_handlers)
+
+# =============================================================================
+# IDEMPOTENCY
+# =============================================================================
+
+async def run_idempotent(request: Request, admin: dict, idempotency_key: Optional[str], handler):
+    """Run handler once per Idempotency-Key and replay its stored response on retries.
+
+    Responses (including 4xx errors) are kept for IDEMPOTENCY_KEY_TTL_HOURS; if the
+    handler fails unexpectedly the key is released so the client can retry. A
+    request that dies while holding its key keeps it only for IDEMPOTENCY_LOCK_SECONDS,
+    after which one retry takes it over.
+    """
+    if not idempotency_key:
+        return await handler()
+
+    key = f"{admin['id']}:{idempotency_key}"
+    fingerprint = f"{request.method} {request.url.path}"
+    owner = str(uuid.uuid4())
+    now = datetime.now(timezone.utc)
+    locked_until = now + timedelta(seconds=IDEMPOTENCY_LOCK_SECONDS)
+    try:
+        await db.idempotency_keys.insert_one({
+            "_id": key,
+            "fingerprint": fingerprint,
+            "state": "in_progress",
+            "owner": owner,
+            "locked_until": locked_until,
+            "expires_at": now + timedelta(hours=IDEMPOTENCY_KEY_TTL_HOURS),
+        })
+    except DuplicateKeyError:
+        stored = await db.idempotency_keys.find_one({"_id": key})
+        if stored is None:
+            raise HTTPException(status_code=409, detail="Request is being retried, please try again", headers={"Retry-After": "1"})
+        if stored["fingerprint"] != fingerprint:
+            raise HTTPException(status_code=422, detail="Idempotency-Key was already used for a different request")
+        if stored["state"] == "done":
+            return JSONResponse(stored["body"], status_code=stored["status_code"], headers={"Idempotent-Replayed": "true"})
+        taken = await db.idempotency_keys.update_one(
+            {"_id": key, "state": "in_progress", "locked_until": {"$lt": now}},
+            {"$set": {"owner": owner, "locked_until": locked_until}}
+        )
+        if taken.modified_count == 0:
+            raise HTTPException(status_code=409, detail="A request with this Idempotency-Key is still in progress", headers={"Retry-After": "1"})
+
+    # Writes are conditional on owner, so a request whose key was taken over cannot clobber the new holder
+    try:
+        body = jsonable_encoder(await handler())
+        status_code = 200
+    except HTTPException as e:
+        if e.status_code >= 500:
+            await db.idempotency_keys.delete_one({"_id": key, "owner": owner})
+            raise
+        body, status_code = {"detail": e.detail}, e.status_code
+    except BaseException:
+        await db.idempotency_keys.delete_one({"_id": key, "owner": owner})
+        raise
+
+    await db.idempotency_keys.update_one(
+        {"_id": key, "owner": owner},
+        {"$set": {"state": "done", "body": body, "status_code": status_code}}
+    )
+    return JSONResponse(body, status_code=status_code)
+
+# =============================================================================
+# AUDIT LOG
+# =============================================================================
+
+# Admin actions are recorded without adding a database round trip to the
+# request: handlers push entries onto a bounded in-memory queue and a
+# background task writes them with insert_many once a batch fills up or
+# AUDIT_FLUSH_INTERVAL_SECONDS pass. Whatever is queued is flushed at shutdown.
+
+class AuditLog:
+    """Buffer audit entries in memory and write them to Mongo in batches"""
+    
+    def __init__(self, max_size: int, batch_size: int, flush_interval: float):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_size)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        # Entries taken off the queue but not yet written, so a cancelled flusher loses nothing
+        self.pending: List[dict] = []
+        self.dropped = 0
+    
+    def record(self, admin: dict, action: str, target_type: str, target_id: Optional[str] = None, details: Optional[dict] = None):
+        entry = {
+            "_id": str(uuid.uuid4()),
+            "admin_id": admin.get("id"),
+            "admin_email": admin.get("email"),
+            "action": action,
+            "target_type": target_type,
+            "target_id": target_id,
+            "details": details or {},
+            "at": datetime.now(timezone.utc),
+        }
+        try:
+            self.queue.put_nowait(entry)
+        except asyncio.QueueFull:
+            # Never block an admin request on auditing
+            self.dropped += 1
+            logger.warning(f"Audit queue full, dropped {action} on {target_type} {target_id}")
+    
+    async def write_pending(self) -> bool:
+        """Write the pending batch; on failure keep it for the next attempt"""
+        if not self.pending:
+            return True
+        try:
+            await db.audit_log.insert_many(self.pending, ordered=False)
+        except BulkWriteError as e:
+            # Entries are keyed by _id, so a batch replayed after an interrupted write only hits duplicates
+            if any(error["code"] != 11000 for error in e.details.get("writeErrors", [])):
+                logger.exception(f"Failed to write {len(self.pending)} audit entries")
+                return False
+        except Exception:
+            logger.exception(f"Failed to write {len(self.pending)} audit entries")
+            return False
+        self.pending = []
+        return True
+    
+    async def take_before(self, deadline: float) -> bool:
+        """Move the next entry into pending if one arrives before the deadline.
+
+        asyncio.wait_for can swallow a cancellation that races with a completed
+        get (Python 3.11), which would leave run() waiting forever at shutdown.
+        """
+        getter = asyncio.ensure_future(self.queue.get())
+        try:
+            await asyncio.wait({getter}, timeout=max(0.0, deadline - asyncio.get_running_loop().time()))
+        finally:
+            if not getter.done():
+                getter.cancel()
+            elif not getter.cancelled():
+                # Keep an entry taken off the queue even when we are being cancelled
+                self.pending.append(getter.result())
+        return getter.done() and not getter.cancelled()
+    
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            if not self.pending:
+                self.pending.append(await self.queue.get())
+            deadline = loop.time() + self.flush_interval
+            while len(self.pending) < self.batch_size and await self.take_before(deadline):
+                pass
+            if not await self.write_pending():
+                await asyncio.sleep(self.flush_interval)
+    
+    async def write_all(self):
+        while self.pending or not self.queue.empty():
+            while len(self.pending) < self.batch_size and not self.queue.empty():
+                self.pending.append(self.queue.get_nowait())
+            if not await self.write_pending():
+                return
+    
+    async def flush(self, timeout: Optional[float] = None):
+        """Write everything still buffered, spilling to disk whatever cannot be written in time.
+
+        Call after the run() task has stopped.
+        """
+        try:
+            await asyncio.wait_for(self.write_all(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        self.spill()
+    
+    def spill(self):
+        entries = self.pending + [self.queue.get_nowait() for _ in range(self.queue.qsize())]
+        self.pending = []
+        if not entries:
+            return
+        SPILL_DIR.mkdir(parents=True, exist_ok=True)
+        path = SPILL_DIR / f"audit-{uuid.uuid4().hex}.jsonl"
+        path.write_text("".join(json_util.dumps(entry) + "\n" for entry in entries))
+        logger.warning(f"Spilled {len(entries)} unwritten audit entries to {path}")
+    
+    def restore_spilled(self):
+        """Requeue entries an earlier process spilled at shutdown"""
+        for path in sorted(SPILL_DIR.glob("audit-*.jsonl")):
+            claimed = path.with_suffix(f".{os.getpid()}.loading")
+            try:
+                # Renaming claims the file, so two workers never load the same spill
+                path.rename(claimed)
+            except OSError:
+                continue
+            self.pending.extend(json_util.loads(line) for line in claimed.read_text().splitlines() if line)
+            claimed.unlink()
+
+audit_log = ContextProxy(lambda: get_runtime().audit_log)
+
+@api_router.get("/admin/audit")
+async def get_audit_log(
+    admin_email: Optional[str] = Query(None, alias="admin"),
+    target_type: Optional[str] = None,
+    target_id: Optional[str] = None,
+    start: Optional[datetime] = Query(None, alias="from"),
+    end: Optional[datetime] = Query(None, alias="to"),
+    limit: int = Query(100, ge=1, le=500),
+    admin: dict = Depends(get_current_admin)
+):
+    query = {}
+    if admin_email:
+        query["admin_email"] = admin_email
+    if target_type:
+        query["target_type"] = target_type
+    if target_id:
+        query["target_id"] = target_id
+    at_range = {}
+    if start:
+        at_range["$gte"] = as_utc(start)
+    if end:
+        at_range["$lt"] = as_utc(end)
+    if at_range:
+        query["at"] = at_range
+    
+    entries = await db.audit_log.find(query).sort("at", -1).limit(limit).to_list(limit)
+    return [{"id": entry.pop("_id"), **entry} for entry in entries]
+
+# =============================================================================
+# READ ROUTING
+# =============================================================================
+
+# Admin requests run in a causally consistent session. The session's cluster and
+# operation times are handed to the client in X-Causal-Token and sent back on
+# the next request, so an admin reading from a secondary always sees their own
+# earlier writes, whichever worker served them.
+CAUSAL_TOKEN_HEADER = "X-Causal-Token"
+
+def encode_causal_token(session: AsyncIOMotorClientSession) -> Optional[str]:
+    if session.cluster_time is None or session.operation_time is None:
+        return None
+    token = bson.encode({"cluster_time": session.cluster_time, "operation_time": session.operation_time})
+    return base64.urlsafe_b64encode(token).decode()
+
+def decode_causal_token(token: Optional[str]) -> Optional[dict]:
+    if not token:
+        return None
+    try:
+        return bson.decode(base64.urlsafe_b64decode(token.encode()))
+    except Exception:
+        return None
+
+async def get_admin_session(request: Request, admin: dict = Depends(get_current_admin)):
+    async with await client.start_session(causal_consistency=True) as session:
+        token = decode_causal_token(request.headers.get(CAUSAL_TOKEN_HEADER))
+        if token:
+            session.advance_cluster_time(token["cluster_time"])
+            session.advance_operation_time(token["operation_time"])
+        request.state.mongo_session = session
+        yield session
+
+class CausalTokenMiddleware:
+    """Return the admin session's causal token in X-Causal-Token.
+
+    A pure ASGI middleware that only touches the response start message, so
+    bodies pass through as single messages and can still be compressed.
+    """
+    
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        async def send_with_token(message):
+            if message["type"] == "http.response.start":
+                # Request.state lives in scope["state"], where get_admin_session left the session
+                session = scope.get("state", {}).get("mongo_session")
+                token = encode_causal_token(session) if session is not None else None
+                if token:
+                    MutableHeaders(scope=message)[CAUSAL_TOKEN_HEADER] = token
+            await send(message)
+        
+        await self.app(scope, receive, send_with_token)
+
+# =============================================================================
+# REQUEST COALESCING
+# =============================================================================
+
+# Public list endpoints get bursts of identical requests (e.g. right after a
+# newsletter). Concurrent requests for the same route and query share a single
+# database call and serialized body, so load scales with distinct queries
+# rather than with clients.
+
+class SingleFlight:
+    """Let concurrent callers with the same key share one in-flight call"""
+    
+    def __init__(self):
+        self.calls: Dict[str, asyncio.Future] = {}
+    
+    async def do(self, key: str, fn: Callable[[], Awaitable]):
+        future = self.calls.get(key)
+        if future is None:
+            future = asyncio.ensure_future(fn())
+            self.calls[key] = future
+            future.add_done_callback(lambda _: self.calls.pop(key, None))
+        # A client disconnecting must not cancel the call other clients are waiting on
+        return await asyncio.shield(future)
+
+read_coalescer = ContextProxy(lambda: get_runtime().read_coalescer)
+
+def coalescing_key(request: Request) -> str:
+    return f"{request.url.path}?{urlencode(sorted(request.query_params.multi_items()))}"
+
+async def coalesced_list(request: Request, model, response_format: str, fetch: Callable[[], Awaitable[list]]) -> Response:
+    """Serve a list endpoint through read_coalescer, serializing the result once"""
+    async def load() -> bytes:
+        adapter = TypeAdapter(List[model])
+        items = adapter.validate_python(await fetch())
+        if response_format == "columnar":
+            return list_response(items, response_format).body
+        return adapter.dump_json(items)
+    
+    body = await read_coalescer.do(coalescing_key(request), load)
+    return Response(body, media_type="application/json")
+
+# =============================================================================
+# DELTA SYNC
+# =============================================================================
+
+# Alumni, events and spotlight documents carry an updated_at that every
+# mutation bumps, and deletes leave a tombstone. List endpoints given
+# ?since=<cursor> return only what changed after the cursor, so the dashboard
+# can patch its copy instead of downloading whole lists again.
+
+DELTA_SYNC_COLLECTIONS = {"alumni", "events", "spotlight"}
+
+def touched(update: dict) -> dict:
+    """Add an updated_at bump to a Mongo update document"""
+    return {**update, "$currentDate": {"updated_at": True}}
+
+async def record_tombstones(collection: str, ids: List[str], session: Optional[AsyncIOMotorClientSession] = None):
+    if collection in DELTA_SYNC_COLLECTIONS and ids:
+        now = datetime.now(timezone.utc)
+        await db.tombstones.insert_many(
+            [{"collection": collection, "id": doc_id, "deleted_at": now} for doc_id in ids],
+            session=session
+        )
+
+async def delta_response(collection: str, query: dict, model, since: datetime, sort: Optional[list] = None) -> JSONResponse:
+    """Return what changed in a list since the cursor.
+
+    Changed documents still matching the list's query come back in "changed";
+    deleted ones and ones that no longer match come back as ids in "deleted".
+    Cursors older than the tombstone window, or with more than
+    DELTA_SYNC_MAX_ROWS changes behind them, get a full snapshot with "reset".
+    Everything reads from the primary so replication lag cannot hide a change
+    from a cursor that has already moved past it.
+    """
+    now = datetime.now(timezone.utc)
+    since = as_utc(since)
+    changed = None
+    if since >= now - timedelta(days=TOMBSTONE_RETENTION_DAYS):
+        recent = {"updated_at": {"$gte": since}}
+        changed = await db[collection].find({**query, **recent}, {"_id": 0}).to_list(DELTA_SYNC_MAX_ROWS + 1)
+        if len(changed) > DELTA_SYNC_MAX_ROWS:
+            # Advancing the cursor past a truncated delta would lose the rest for good
+            changed = None
+        else:
+            left = await db[collection].find({**recent, "$nor": [query]}, {"_id": 0, "id": 1}).to_list(None) if query else []
+            tombstones = await db.tombstones.find(
+                {"collection": collection, "deleted_at": {"$gte": since}}, {"_id": 0, "id": 1}
+            ).to_list(None)
+            deleted, reset = [doc["id"] for doc in left + tombstones], False
+    if changed is None:
+        snapshot = db[collection].find(query, {"_id": 0})
+        if sort:
+            snapshot = snapshot.sort(sort)
+        changed, deleted, reset = await snapshot.to_list(DELTA_SYNC_MAX_ROWS), [], True
+    
+    return JSONResponse({
+        "changed": jsonable_encoder(TypeAdapter(List[model]).validate_python(changed)),
+        "deleted": deleted,
+        "reset": reset,
+        "since": (now - timedelta(seconds=DELTA_SYNC_OVERLAP_SECONDS)).isoformat(),
+    })
+
+# =============================================================================
+# DUPLICATE DETECTION
+# =============================================================================
+
+# Registrations are indexed under a few normalized "blocking keys". A new
+# registration only has to be scored against the handful of records sharing one
+# of its keys instead of being compared with the whole membership.
+
+SOUNDEX_CODES = {
+    letter: str(digit)
+    for digit, letters in enumerate(["aeiouyhw", "bfpv", "cgjkqsxz", "dt", "l", "mn", "r"])
+    for letter in letters
+}
+
+def soundex(name: str) -> str:
+    letters = [c for c in name.lower() if c in SOUNDEX_CODES]
+    if not letters:
+        return ""
+    code = letters[0].upper()
+    previous = SOUNDEX_CODES[letters[0]]
+    for letter in letters[1:]:
+        digit = SOUNDEX_CODES[letter]
+        if digit != "0" and digit != previous:
+            code += digit
+        if letter not in "hw":
+            previous = digit
+    return (code + "000")[:4]
+
+def normalize_mobile(mobile: str) -> str:
+    """Best-effort E.164 form, assuming DEFAULT_COUNTRY_CODE for local numbers"""
+    digits = re.sub(r"\D", "", mobile)
+    if mobile.strip().startswith("+"):
+        return f"+{digits}"
+    if digits.startswith("00"):
+        return f"+{digits[2:]}"
+    digits = digits.lstrip("0")
+    if len(digits) <= 10:
+        return f"+{DEFAULT_COUNTRY_CODE}{digits}"
+    return f"+{digits}"
+
+def normalize_name(*parts: str) -> str:
+    return " ".join(" ".join(parts).lower().split())
+
+def duplicate_blocking_keys(alumni: dict) -> List[str]:
+    full_name = normalize_name(alumni["first_name"], alumni["last_name"])
+    keys = [
+        f"name:{soundex(alumni['first_name'])}{soundex(alumni['last_name'])}:{alumni['year_of_leaving']}",
+        f"house:{full_name}:{alumni['last_house'].strip().lower()}",
+    ]
+    mobile_digits = re.sub(r"\D", "", alumni["mobile"])
+    if len(mobile_digits) >= 7:
+        keys.append(f"mobile:{normalize_mobile(alumni['mobile'])}")
+    return keys
+
+def duplicate_score(candidate: dict, alumni: dict) -> Tuple[float, List[str]]:
+    """Score how likely two registrations are the same person, from 0 to 1.
+
+    Weights are balanced so that a matching mobile on its own, or a same-sounding
+    name with the same batch and house, crosses the default 0.45 threshold.
+    """
+    score, reasons = 0.0, []
+    if normalize_mobile(candidate["mobile"]) == normalize_mobile(alumni["mobile"]):
+        score += 0.45
+        reasons.append("same mobile")
+    name_similarity = SequenceMatcher(
+        None,
+        normalize_name(candidate["first_name"], candidate["last_name"]),
+        normalize_name(alumni["first_name"], alumni["last_name"])
+    ).ratio()
+    score += 0.25 * name_similarity
+    if name_similarity >= 0.85:
+        reasons.append("similar name")
+    if (soundex(candidate["first_name"]), soundex(candidate["last_name"])) == (soundex(alumni["first_name"]), soundex(alumni["last_name"])):
+        score += 0.1
+        reasons.append("same-sounding name")
+    if candidate["year_of_leaving"] == alumni["year_of_leaving"]:
+        score += 0.1
+        reasons.append("same batch")
+    if candidate["last_house"].strip().lower() == alumni["last_house"].strip().lower():
+        score += 0.1
+        reasons.append("same house")
+    return round(score, 2), reasons
+
+async def find_possible_duplicates(alumni: dict, keys: List[str]) -> List[DuplicateMatch]:
+    candidates = await db.alumni.find(
+        {"duplicate_keys": {"$in": keys}, "status": {"$ne": "rejected"}, "id": {"$ne": alumni["id"]}},
+        {"_id": 0, "id": 1, "first_name": 1, "last_name": 1, "email": 1, "mobile": 1,
+         "year_of_leaving": 1, "last_house": 1, "status": 1}
+    ).to_list(50)
+    
+    matches = []
+    for candidate in candidates:
+        score, reasons = duplicate_score(candidate, alumni)
+        if score >= DUPLICATE_SCORE_THRESHOLD:
+            matches.append(DuplicateMatch(
+                id=candidate["id"],
+                name=f"{candidate['first_name']} {candidate['last_name']}",
+                email=candidate["email"],
+                status=candidate["status"],
+                score=score,
+                reasons=reasons
+            ))
+    return sorted(matches, key=lambda m: m.score, reverse=True)
+
 # =============================================================================
 # AUTH ROUTES
 # =============================================================================
 
 @api_router.post("/auth/admin/login", response_model=AdminResponse)
-async def admin_login(login: AdminLogin):
+async def admin_login(login: AdminLogin, request: Request):
+    await enforce_rate_limits("login", [
+        ("ip", client_ip(request), LOGIN_RATE_PER_IP),
+        ("email", login.email.lower(), LOGIN_RATE_PER_EMAIL),
+    ])
+    
     admin = await db.admins.find_one({"email": login.email}, {"_id": 0})
     if not admin:
         raise HTTPException(status_code=401, detail="Invalid credentials")
     
-    if not verify_password(login.password, admin["password"]):
+    # bcrypt is deliberately slow, so run it off the event loop under the concurrency cap
+    async with expensive_handlers.slot():
+        valid = await run_in_threadpool(verify_password, login.password, admin["password"])
+    if not valid:
         raise HTTPException(status_code=401, detail="Invalid credentials")
     
     token = create_jwt_token({"id": admin["id"], "email": admin["email"], "role": "admin"})
@@ -348,15 +1260,25 @@ async def admin_login(login: AdminLogin):
 # =============================================================================
 
 @api_router.post("/alumni/register", status_code=201)
-async def register_alumni(data: AlumniRegistration):
+async def register_alumni(data: AlumniRegistration, request: Request):
+    await enforce_rate_limits("register", [
+        ("ip", client_ip(request), REGISTER_RATE_PER_IP),
+        ("email", data.email.lower(), REGISTER_RATE_PER_EMAIL),
+    ])
+    
+    async with expensive_handlers.slot():
+        return await create_registration(data)
+
+async def create_registration(data: AlumniRegistration) -> dict:
     # Check if email already exists
     existing = await db.alumni.find_one({"email": data.email}, {"_id": 0})
     if existing:
         raise HTTPException(status_code=400, detail="Email already registered")
     
     alumni = Alumni(**data.model_dump())
+    alumni.duplicate_keys = duplicate_blocking_keys(data.model_dump())
+    alumni.possible_duplicates = await find_possible_duplicates(alumni.model_dump(), alumni.duplicate_keys)
     doc = alumni.model_dump()
-    doc['created_at'] = doc['created_at'].isoformat()
     
     await db.alumni.insert_one(doc)
     
@@ -367,21 +1289,26 @@ async def register_alumni(data: AlumniRegistration):
         message=f"{data.first_name} {data.last_name} ({data.email}) has registered from batch {data.year_of_leaving}",
         alumni_id=alumni.id
     )
-    notif_doc = notification.model_dump()
-    notif_doc['created_at'] = notif_doc['created_at'].isoformat()
-    await db.notifications.insert_one(notif_doc)
+    if ADMIN_EMAIL_MODE == "immediate":
+        notification.emailed = await run_in_threadpool(send_registration_notification, doc)
+    await db.notifications.insert_one(notification.model_dump())
+    await record_analytics(doc, "registration", alumni.created_at)
     
-    # Send email notification to admin
-    send_registration_notification(doc)
+    if ADMIN_EMAIL_MODE == "digest":
+        # The digest job decides whether enough registrations have piled up
+        digest_wakeup.set()
     
     return {"message": "Registration submitted successfully. You will receive confirmation once approved.", "id": alumni.id}
 
 @api_router.get("/alumni", response_model=List[AlumniResponse])
 async def get_alumni(
+    request: Request,
     batch: Optional[int] = None,
     profession: Optional[str] = None,
     city: Optional[str] = None,
-    status: Optional[str] = "approved"
+    status: Optional[str] = "approved",
+    since: Optional[datetime] = None,
+    response_format: str = Query("json", alias="format", pattern="^(json|columnar)$")
 ):
     query = {}
     if batch:
@@ -393,68 +1320,121 @@ async def get_alumni(
     if status:
         query["status"] = status
     
-    alumni_list = await db.alumni.find(query, {"_id": 0}).to_list(1000)
-    
-    result = []
-    for a in alumni_list:
-        a['created_at'] = a['created_at'] if isinstance(a['created_at'], str) else a['created_at'].isoformat()
-        a['approved_at'] = a.get('approved_at', None)
-        if a['approved_at'] and not isinstance(a['approved_at'], str):
-            a['approved_at'] = a['approved_at'].isoformat()
-        result.append(AlumniResponse(**a))
-    
-    return result
+    fetch = lambda: replica_db.alumni.find(query, {"_id": 0}).to_list(1000)
+    if since:
+        return await delta_response("alumni", query, AlumniResponse, since)
+    return await coalesced_list(request, AlumniResponse, response_format, fetch)
 
-@api_router.get("/alumni/pending", response_model=List[AlumniResponse])
-async def get_pending_alumni(admin: dict = Depends(get_current_admin)):
-    alumni_list = await db.alumni.find({"status": "pending"}, {"_id": 0}).to_list(1000)
-    
-    result = []
-    for a in alumni_list:
-        a['created_at'] = a['created_at'] if isinstance(a['created_at'], str) else a['created_at'].isoformat()
-        a['approved_at'] = a.get('approved_at', None)
-        result.append(AlumniResponse(**a))
-    
-    return result
+@api_router.get("/alumni/pending", response_model=List[PendingAlumniResponse])
+async def get_pending_alumni(
+    since: Optional[datetime] = None,
+    response_format: str = Query("json", alias="format", pattern="^(json|columnar)$"),
+    admin: dict = Depends(get_current_admin),
+    session: AsyncIOMotorClientSession = Depends(get_admin_session)
+):
+    if since:
+        return await delta_response("alumni", {"status": "pending"}, PendingAlumniResponse, since)
+    alumni_list = await causal_db.alumni.find({"status": "pending"}, {"_id": 0}, session=session).to_list(1000)
+    result = [PendingAlumniResponse(**a) for a in alumni_list]
+    return list_response(result, response_format)
 
 @api_router.get("/alumni/all", response_model=List[AlumniResponse])
-async def get_all_alumni(admin: dict = Depends(get_current_admin)):
-    alumni_list = await db.alumni.find({}, {"_id": 0}).to_list(1000)
-    
-    result = []
-    for a in alumni_list:
-        a['created_at'] = a['created_at'] if isinstance(a['created_at'], str) else a['created_at'].isoformat()
-        a['approved_at'] = a.get('approved_at', None)
-        if a['approved_at'] and not isinstance(a['approved_at'], str):
-            a['approved_at'] = a['approved_at'].isoformat()
-        result.append(AlumniResponse(**a))
-    
-    return result
+async def get_all_alumni(
+    since: Optional[datetime] = None,
+    response_format: str = Query("json", alias="format", pattern="^(json|columnar)$"),
+    admin: dict = Depends(get_current_admin),
+    session: AsyncIOMotorClientSession = Depends(get_admin_session)
+):
+    if since:
+        return await delta_response("alumni", {}, AlumniResponse, since)
+    alumni_list = await causal_db.alumni.find({}, {"_id": 0}, session=session).to_list(1000)
+    result = [AlumniResponse(**a) for a in alumni_list]
+    return list_response(result, response_format)
 
-@api_router.put("/alumni/{alumni_id}/approve")
-async def approve_alumni(alumni_id: str, admin: dict = Depends(get_current_admin)):
-    alumni = await db.alumni.find_one({"id": alumni_id}, {"_id": 0})
-    if not alumni:
+async def next_ehsas_sequence(year_of_leaving: int) -> int:
+    """Atomically allocate the next EHSAS ID counter value for a batch"""
+    key = f"ehsas_id:{year_of_leaving}"
+    if not await db.counters.find_one({"_id": key}, {"_id": 1}):
+        # Start after the members approved before per-batch counters existed
+        issued = await db.alumni.count_documents({
+            "year_of_leaving": year_of_leaving,
+            "status": "approved",
+            "ehsas_id": {"$ne": None}
+        })
+        try:
+            await db.counters.insert_one({"_id": key, "seq": issued})
+        except DuplicateKeyError:
+            pass
+    counter = await db.counters.find_one_and_update(
+        {"_id": key},
+        {"$inc": {"seq": 1}},
+        return_document=ReturnDocument.AFTER
+    )
+    return counter["seq"]
+
+async def transition_pending_alumni(alumni_id: str, update: dict, session: Optional[AsyncIOMotorClientSession] = None) -> dict:
+    """Move a pending registration to a new status, or raise if it is no longer pending.
+
+    The status check and the write are a single compare-and-set, so double clicks
+    and concurrent admins can never apply the same transition twice.
+    """
+    alumni = await db.alumni.find_one_and_update(
+        {"id": alumni_id, "status": "pending"},
+        touched({"$set": update}),
+        projection={"_id": 0},
+        return_document=ReturnDocument.AFTER,
+        session=session
+    )
+    if alumni:
+        return alumni
+    await raise_not_pending(alumni_id, session)
+
+async def raise_not_pending(alumni_id: str, session: Optional[AsyncIOMotorClientSession] = None):
+    current = await db.alumni.find_one({"id": alumni_id}, {"_id": 0, "status": 1}, session=session)
+    if not current:
         raise HTTPException(status_code=404, detail="Alumni not found")
+    state = "being approved" if current["status"] == "approving" else current["status"]
+    raise HTTPException(status_code=409, detail=f"Alumni registration is already {state}")
+
+async def approve_pending_alumni(alumni_id: str, admin: dict, session: Optional[AsyncIOMotorClientSession] = None) -> dict:
+    # Claim the registration first, so only the request that wins allocates an EHSAS ID
+    # and double clicks leave no gaps in a batch's series. A claim left behind by a
+    # request that died expires, and a retry takes it over.
+    now = datetime.now(timezone.utc)
+    claimed = await db.alumni.find_one_and_update(
+        {"id": alumni_id, "$or": [
+            {"status": "pending"},
+            {"status": "approving", "approving_until": {"$lt": now}},
+        ]},
+        touched({"$set": {"status": "approving", "approving_until": now + timedelta(seconds=APPROVAL_CLAIM_SECONDS)}}),
+        projection={"_id": 0, "year_of_leaving": 1},
+        return_document=ReturnDocument.AFTER,
+        session=session
+    )
+    if not claimed:
+        await raise_not_pending(alumni_id, session)
     
-    # Count approved alumni for this batch to generate EHSAS ID
-    count = await db.alumni.count_documents({
-        "year_of_leaving": alumni["year_of_leaving"],
-        "status": "approved"
-    })
-    ehsas_id = generate_ehsas_id(alumni["year_of_leaving"], count + 1)
-    
-    await db.alumni.update_one(
-        {"id": alumni_id},
-        {"$set": {
-            "status": "approved",
-            "ehsas_id": ehsas_id,
-            "approved_at": datetime.now(timezone.utc).isoformat()
-        }}
+    # The ID is written by the same update that completes the approval, so an
+    # approved member always has one
+    sequence = await next_ehsas_sequence(claimed["year_of_leaving"])
+    ehsas_id = generate_ehsas_id(claimed["year_of_leaving"], sequence)
+    alumni = await db.alumni.find_one_and_update(
+        {"id": alumni_id, "status": "approving"},
+        touched({
+            "$set": {"status": "approved", "approved_at": datetime.now(timezone.utc), "ehsas_id": ehsas_id},
+            "$unset": {"approving_until": ""},
+        }),
+        projection={"_id": 0},
+        return_document=ReturnDocument.AFTER,
+        session=session
     )
+    if not alumni:
+        await raise_not_pending(alumni_id, session)
+    await record_analytics(alumni, "approval", alumni["approved_at"])
+    audit_log.record(admin, "alumni.approve", "alumni", alumni_id, {"ehsas_id": ehsas_id})
     
     # Send approval email with EHSAS ID
-    email_sent = send_approval_email(alumni, ehsas_id)
+    email_sent = await run_in_threadpool(send_approval_email, alumni, ehsas_id)
     
     return {
         "message": f"Alumni approved with EHSAS ID: {ehsas_id}", 
@@ -462,65 +1442,256 @@ async def approve_alumni(alumni_id: str, admin: dict = Depends(get_current_admin
         "email_sent": email_sent
     }
 
-@api_router.put("/alumni/{alumni_id}/reject")
-async def reject_alumni(alumni_id: str, admin: dict = Depends(get_current_admin)):
-    alumni = await db.alumni.find_one({"id": alumni_id}, {"_id": 0})
-    if not alumni:
-        raise HTTPException(status_code=404, detail="Alumni not found")
-    
-    await db.alumni.update_one(
-        {"id": alumni_id},
-        {"$set": {"status": "rejected"}}
-    )
+async def reject_pending_alumni(alumni_id: str, admin: dict, session: Optional[AsyncIOMotorClientSession] = None) -> dict:
+    alumni = await transition_pending_alumni(alumni_id, {
+        "status": "rejected",
+        "rejected_at": datetime.now(timezone.utc)
+    }, session)
+    await record_analytics(alumni, "rejection", alumni["rejected_at"])
+    audit_log.record(admin, "alumni.reject", "alumni", alumni_id)
     
     # Send rejection email
-    send_rejection_email(alumni)
+    await run_in_threadpool(send_rejection_email, alumni)
     
     return {"message": "Alumni registration rejected"}
 
+@api_router.put("/alumni/{alumni_id}/approve")
+async def approve_alumni(
+    alumni_id: str,
+    request: Request,
+    idempotency_key: Optional[str] = Header(None),
+    admin: dict = Depends(get_current_admin),
+    session: AsyncIOMotorClientSession = Depends(get_admin_session)
+):
+    return await run_idempotent(request, admin, idempotency_key, lambda: approve_pending_alumni(alumni_id, admin, session))
+
+@api_router.put("/alumni/{alumni_id}/reject")
+async def reject_alumni(
+    alumni_id: str,
+    request: Request,
+    idempotency_key: Optional[str] = Header(None),
+    admin: dict = Depends(get_current_admin),
+    session: AsyncIOMotorClientSession = Depends(get_admin_session)
+):
+    return await run_idempotent(request, admin, idempotency_key, lambda: reject_pending_alumni(alumni_id, admin, session))
+
 # =============================================================================
 # EVENTS ROUTES
 # =============================================================================
 
 @api_router.get("/events", response_model=List[Event])
-async def get_events(active_only: bool = True):
+async def get_events(
+    request: Request,
+    active_only: bool = True,
+    start_from: Optional[datetime] = Query(None, alias="from"),
+    to: Optional[datetime] = None,
+    upcoming: bool = False,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=100),
+    since: Optional[datetime] = None,
+    response_format: str = Query("json", alias="format", pattern="^(json|columnar)$")
+):
     query = {"is_active": True} if active_only else {}
-    events = await db.events.find(query, {"_id": 0}).to_list(100)
-    return events
+    # Range filters scan the (is_active, start_at) index in start order
+    start_range = {}
+    if upcoming:
+        start_range["$gte"] = datetime.now(timezone.utc)
+    if start_from:
+        start_from = as_utc(start_from)
+        start_range["$gte"] = max(start_from, start_range.get("$gte", start_from))
+    if to:
+        start_range["$lt"] = as_utc(to)
+    if start_range:
+        query["start_at"] = start_range
+    
+    fetch = lambda: replica_db.events.find(query, {"_id": 0}).sort("start_at", 1).skip(skip).limit(limit).to_list(limit)
+    if since:
+        return await delta_response("events", query, Event, since, sort=[("start_at", 1)])
+    return await coalesced_list(request, Event, response_format, fetch)
 
 @api_router.post("/events", response_model=Event)
-async def create_event(data: EventCreate, admin: dict = Depends(get_current_admin)):
-    event = Event(**data.model_dump())
-    doc = event.model_dump()
-    doc['created_at'] = doc['created_at'].isoformat()
-    await db.events.insert_one(doc)
+async def create_event(data: EventCreate, admin: dict = Depends(get_current_admin), session: AsyncIOMotorClientSession = Depends(get_admin_session)):
+    event = Event(**data.model_dump(), start_at=parse_event_start(data.date, data.time))
+    await db.events.insert_one(event.model_dump(), session=session)
+    audit_log.record(admin, "event.create", "event", event.id, {"title": event.title})
     return event
 
 @api_router.put("/events/{event_id}")
-async def update_event(event_id: str, data: EventCreate, admin: dict = Depends(get_current_admin)):
-    result = await db.events.update_one(
-        {"id": event_id},
-        {"$set": data.model_dump()}
-    )
+async def update_event(event_id: str, data: EventCreate, admin: dict = Depends(get_current_admin), session: AsyncIOMotorClientSession = Depends(get_admin_session)):
+    update = data.model_dump()
+    update["start_at"] = parse_event_start(data.date, data.time)
+    query = {"id": event_id}
+    if "capacity" not in data.model_fields_set:
+        # Clients that do not know about capacity must not make a capped event unlimited
+        del update["capacity"]
+    elif data.capacity is not None:
+        # Seats already taken cannot be revoked, so capacity never drops below them
+        query["$expr"] = {"$lte": [{"$ifNull": ["$registered_count", 0]}, data.capacity]}
+    result = await db.events.update_one(query, touched({"$set": update}), session=session)
     if result.matched_count == 0:
-        raise HTTPException(status_code=404, detail="Event not found")
+        event = await db.events.find_one({"id": event_id}, {"_id": 0, "registered_count": 1}, session=session)
+        if not event:
+            raise HTTPException(status_code=404, detail="Event not found")
+        raise HTTPException(
+            status_code=409,
+            detail=f"Capacity cannot be below the {event.get('registered_count', 0)} seats already taken"
+        )
+    
+    audit_log.record(admin, "event.update", "event", event_id, jsonable_encoder(data))
+    
+    # Capacity may have grown, so hand any new seats to the waitlist
+    await promote_waitlist(event_id)
     return {"message": "Event updated"}
 
 @api_router.delete("/events/{event_id}")
-async def delete_event(event_id: str, admin: dict = Depends(get_current_admin)):
-    result = await db.events.delete_one({"id": event_id})
+async def delete_event(event_id: str, admin: dict = Depends(get_current_admin), session: AsyncIOMotorClientSession = Depends(get_admin_session)):
+    result = await db.events.delete_one({"id": event_id}, session=session)
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Event not found")
+    await record_tombstones("events", [event_id], session)
+    audit_log.record(admin, "event.delete", "event", event_id)
+    await db.event_rsvps.delete_many({"event_id": event_id}, session=session)
     return {"message": "Event deleted"}
 
+# =============================================================================
+# EVENT RSVP
+# =============================================================================
+
+# Seats are only ever taken with a conditional $inc guarded by capacity, so the
+# check and the increment are a single atomic operation and an event can never
+# be oversold no matter how many RSVPs arrive at once.
+
+async def take_event_seat(event_id: str) -> bool:
+    result = await db.events.update_one(
+        {
+            "id": event_id,
+            "is_active": True,
+            "$or": [
+                {"capacity": None},
+                {"$expr": {"$lt": [{"$ifNull": ["$registered_count", 0]}, "$capacity"]}},
+            ],
+        },
+        touched({"$inc": {"registered_count": 1}})
+    )
+    return result.modified_count == 1
+
+async def release_event_seat(event_id: str):
+    await db.events.update_one(
+        {"id": event_id, "registered_count": {"$gt": 0}},
+        touched({"$inc": {"registered_count": -1}})
+    )
+
+async def promote_waitlist(event_id: str):
+    """Move waitlisted RSVPs into free seats, oldest first"""
+    while True:
+        candidate = await db.event_rsvps.find_one(
+            {"event_id": event_id, "status": "waitlisted"},
+            {"_id": 0, "id": 1},
+            sort=[("waitlist_number", 1)]
+        )
+        if not candidate or not await take_event_seat(event_id):
+            return
+        promoted = await db.event_rsvps.update_one(
+            {"id": candidate["id"], "status": "waitlisted"},
+            {"$set": {"status": "confirmed", "waitlist_number": None}}
+        )
+        if promoted.modified_count == 0:
+            # The candidate cancelled in the meantime; give the seat back and try the next one
+            await release_event_seat(event_id)
+            continue
+        await db.events.update_one({"id": event_id}, touched({"$inc": {"waitlist_count": -1}}))
+
+def rsvp_status_response(rsvp: dict) -> JSONResponse:
+    return JSONResponse(EventRSVPStatus(**rsvp).model_dump(), status_code=200)
+
+@api_router.post(
+    "/events/{event_id}/rsvp",
+    response_model=EventRSVP,
+    status_code=201,
+    responses={200: {"model": EventRSVPStatus, "description": "This email has already RSVPed"}}
+)
+async def create_rsvp(event_id: str, data: EventRSVPCreate):
+    event = await db.events.find_one({"id": event_id, "is_active": True}, {"_id": 0, "id": 1})
+    if not event:
+        raise HTTPException(status_code=404, detail="Event not found")
+    
+    email = data.email.lower()
+    existing = await db.event_rsvps.find_one({"event_id": event_id, "email": email}, {"_id": 0})
+    if existing and existing["status"] != "cancelled":
+        # Anyone can post any email, so never hand back another guest's RSVP
+        return rsvp_status_response(existing)
+    if existing:
+        await db.event_rsvps.delete_one({"id": existing["id"], "status": "cancelled"})
+    
+    rsvp = EventRSVP(event_id=event_id, name=data.name, email=email)
+    if not await take_event_seat(event_id):
+        counters = await db.events.find_one_and_update(
+            {"id": event_id},
+            touched({"$inc": {"waitlist_count": 1, "waitlist_sequence": 1}}),
+            projection={"_id": 0, "waitlist_sequence": 1},
+            return_document=ReturnDocument.AFTER
+        )
+        rsvp.status = "waitlisted"
+        rsvp.waitlist_number = counters["waitlist_sequence"]
+    
+    try:
+        await db.event_rsvps.insert_one(rsvp.model_dump())
+    except DuplicateKeyError:
+        # The same email RSVPed concurrently; undo our counter change and return the winner
+        if rsvp.status == "confirmed":
+            await release_event_seat(event_id)
+            await promote_waitlist(event_id)
+        else:
+            await db.events.update_one({"id": event_id}, touched({"$inc": {"waitlist_count": -1}}))
+        return rsvp_status_response(await db.event_rsvps.find_one({"event_id": event_id, "email": email}, {"_id": 0}))
+    
+    if rsvp.status == "waitlisted":
+        # A seat freed between our failed take and this insert was offered to a waitlist
+        # that did not include us yet, so look again now that we are on it
+        await promote_waitlist(event_id)
+        current = await db.event_rsvps.find_one({"id": rsvp.id}, {"_id": 0})
+        if current:
+            rsvp = EventRSVP(**current)
+    return rsvp
+
+@api_router.delete("/events/{event_id}/rsvp/{rsvp_id}")
+async def cancel_rsvp(event_id: str, rsvp_id: str):
+    # Only a live RSVP can be cancelled, so a repeated cancel never frees a seat twice
+    rsvp = await db.event_rsvps.find_one_and_update(
+        {"id": rsvp_id, "event_id": event_id, "status": {"$in": ["confirmed", "waitlisted"]}},
+        {"$set": {"status": "cancelled", "waitlist_number": None}},
+        projection={"_id": 0},
+        return_document=ReturnDocument.BEFORE
+    )
+    if not rsvp:
+        raise HTTPException(status_code=404, detail="RSVP not found or already cancelled")
+    
+    if rsvp["status"] == "confirmed":
+        await release_event_seat(event_id)
+        await promote_waitlist(event_id)
+    else:
+        await db.events.update_one({"id": event_id}, touched({"$inc": {"waitlist_count": -1}}))
+    return {"message": "RSVP cancelled"}
+
+@api_router.get("/events/{event_id}/rsvps", response_model=List[EventRSVP])
+async def get_event_rsvps(event_id: str, admin: dict = Depends(get_current_admin), session: AsyncIOMotorClientSession = Depends(get_admin_session)):
+    rsvps = await causal_db.event_rsvps.find({"event_id": event_id}, {"_id": 0}, session=session).sort("created_at", 1).to_list(5000)
+    return rsvps
+
 # =============================================================================
 # SPOTLIGHT ROUTES
 # =============================================================================
 
 @api_router.get("/spotlight", response_model=List[SpotlightAlumni])
-async def get_spotlight_alumni():
-    spotlight = await db.spotlight.find({"is_featured": True}, {"_id": 0}).to_list(20)
-    return spotlight
+async def get_spotlight_alumni(
+    request: Request,
+    since: Optional[datetime] = None,
+    response_format: str = Query("json", alias="format", pattern="^(json|columnar)$")
+):
+    fetch = lambda: replica_db.spotlight.find({"is_featured": True}, {"_id": 0}).to_list(20)
+    if since:
+        return await delta_response("spotlight", {"is_featured": True}, SpotlightAlumni, since)
+    return await coalesced_list(request, SpotlightAlumni, response_format, fetch)
 
 class SpotlightCreate(BaseModel):
     name: str
@@ -531,38 +1702,208 @@ class SpotlightCreate(BaseModel):
     image_url: Optional[str] = ""
 
 @api_router.post("/spotlight", response_model=SpotlightAlumni)
-async def create_spotlight(data: SpotlightCreate, admin: dict = Depends(get_current_admin)):
+async def create_spotlight(data: SpotlightCreate, admin: dict = Depends(get_current_admin), session: AsyncIOMotorClientSession = Depends(get_admin_session)):
     spotlight = SpotlightAlumni(**data.model_dump())
     doc = spotlight.model_dump()
-    await db.spotlight.insert_one(doc)
+    await db.spotlight.insert_one(doc, session=session)
+    audit_log.record(admin, "spotlight.create", "spotlight", spotlight.id, {"name": spotlight.name})
     return spotlight
 
 @api_router.put("/spotlight/{spotlight_id}")
-async def update_spotlight(spotlight_id: str, data: SpotlightCreate, admin: dict = Depends(get_current_admin)):
+async def update_spotlight(spotlight_id: str, data: SpotlightCreate, admin: dict = Depends(get_current_admin), session: AsyncIOMotorClientSession = Depends(get_admin_session)):
     result = await db.spotlight.update_one(
         {"id": spotlight_id},
-        {"$set": data.model_dump()}
+        touched({"$set": data.model_dump()}),
+        session=session
     )
     if result.matched_count == 0:
         raise HTTPException(status_code=404, detail="Spotlight alumni not found")
+    audit_log.record(admin, "spotlight.update", "spotlight", spotlight_id, jsonable_encoder(data))
     return {"message": "Spotlight alumni updated"}
 
 @api_router.delete("/spotlight/{spotlight_id}")
-async def delete_spotlight(spotlight_id: str, admin: dict = Depends(get_current_admin)):
-    result = await db.spotlight.delete_one({"id": spotlight_id})
+async def delete_spotlight(spotlight_id: str, admin: dict = Depends(get_current_admin), session: AsyncIOMotorClientSession = Depends(get_admin_session)):
+    result = await db.spotlight.delete_one({"id": spotlight_id}, session=session)
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Spotlight alumni not found")
+    await record_tombstones("spotlight", [spotlight_id], session)
+    audit_log.record(admin, "spotlight.delete", "spotlight", spotlight_id)
     return {"message": "Spotlight alumni deleted"}
 
+# =============================================================================
+# IMAGE UPLOADS
+# =============================================================================
+
+# Uploaded images are stored under the SHA-256 of the original bytes, so the
+# same picture uploaded twice is only processed once and every URL is
+# immutable and safe to cache forever.
+IMAGE_NAME_PATTERN = re.compile(r"^[0-9a-f]{64}(_thumb)?\.webp$")
+IMAGE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+UPLOAD_CHUNK_SIZE = 64 * 1024
+
+def get_image_pool() -> ProcessPoolExecutor:
+    runtime = get_runtime()
+    if runtime.image_pool is None:
+        runtime.image_pool = ProcessPoolExecutor(max_workers=IMAGE_WORKERS)
+    return runtime.image_pool
+
+def image_url(name: str) -> str:
+    return f"/api/uploads/images/{name}"
+
+def render_image_variants(source: str, image_hash: str) -> dict:
+    """Resize an uploaded image and write WebP full-size and thumbnail variants.
+
+    Runs inside the image process pool, so it must stay a module-level function.
+    """
+    from PIL import Image, ImageOps
+    
+    with Image.open(source) as original:
+        img = ImageOps.exif_transpose(original)
+        if img.mode not in ("RGB", "RGBA"):
+            img = img.convert("RGBA" if "transparency" in img.info else "RGB")
+
+        variants = {
+            f"{image_hash}.webp": IMAGE_MAX_DIMENSION,
+            f"{image_hash}_thumb.webp": THUMBNAIL_DIMENSION,
+        }
+        sizes = {}
+        for name, dimension in variants.items():
+            variant = img.copy()
+            variant.thumbnail((dimension, dimension))
+            # Concurrent uploads of the same image each render into their own temp file
+            fd, partial = tempfile.mkstemp(dir=UPLOAD_DIR, prefix=f".{name}.", suffix=".partial")
+            try:
+                with os.fdopen(fd, "wb") as out:
+                    variant.save(out, "WEBP", quality=82, method=4)
+                    os.fchmod(out.fileno(), 0o644)  # mkstemp creates files readable by the owner only
+                os.replace(partial, UPLOAD_DIR / name)
+            except BaseException:
+                os.unlink(partial)
+                raise
+            sizes[name] = {"width": variant.width, "height": variant.height}
+        return sizes
+
+async def stream_upload_to_disk(request: Request, field_name: str = "file"):
+    """Stream one file field of a multipart request into a temp file.
+
+    The body is parsed chunk by chunk and hashed as it is written, so memory use
+    stays constant regardless of the upload size. Returns (path, sha256, size).
+    """
+    content_type, params = parse_options_header(request.headers.get("content-type", ""))
+    boundary = params.get(b"boundary")
+    if content_type != b"multipart/form-data" or not boundary:
+        raise HTTPException(status_code=400, detail="Expected a multipart/form-data upload")
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > UPLOAD_MAX_BYTES + 16 * 1024:
+        raise HTTPException(status_code=413, detail="Upload is too large")
+
+    tmp_dir = UPLOAD_DIR / "tmp"
+    tmp_dir.mkdir(parents=True, exist_ok=True)
+    tmp = tempfile.NamedTemporaryFile(dir=tmp_dir, delete=False)
+    digest = hashlib.sha256()
+    state = {"header_field": b"", "header_value": b"", "headers": {}, "capturing": False, "found": False, "size": 0}
+    pending: List[bytes] = []
+
+    def on_part_begin():
+        state["headers"] = {}
+        state["capturing"] = False
+
+    def on_header_field(data, start, end):
+        state["header_field"] += data[start:end]
+
+    def on_header_value(data, start, end):
+        state["header_value"] += data[start:end]
+
+    def on_header_end():
+        state["headers"][state["header_field"].lower()] = state["header_value"]
+        state["header_field"] = b""
+        state["header_value"] = b""
+
+    def on_headers_finished():
+        _, disposition = parse_options_header(state["headers"].get(b"content-disposition", b""))
+        if disposition.get(b"name") == field_name.encode() and not state["found"]:
+            state["capturing"] = True
+            state["found"] = True
+
+    def on_part_data(data, start, end):
+        if state["capturing"]:
+            chunk = bytes(data[start:end])
+            state["size"] += len(chunk)
+            digest.update(chunk)
+            pending.append(chunk)
+
+    parser = MultipartParser(boundary, callbacks={
+        "on_part_begin": on_part_begin,
+        "on_header_field": on_header_field,
+        "on_header_value": on_header_value,
+        "on_header_end": on_header_end,
+        "on_headers_finished": on_headers_finished,
+        "on_part_data": on_part_data,
+    })
+
+    try:
+        async for chunk in request.stream():
+            parser.write(chunk)
+            if state["size"] > UPLOAD_MAX_BYTES:
+                raise HTTPException(status_code=413, detail="Upload is too large")
+            if pending:
+                await run_in_threadpool(tmp.write, b"".join(pending))
+                pending.clear()
+        parser.finalize()
+        tmp.close()
+        if not state["found"] or state["size"] == 0:
+            raise HTTPException(status_code=400, detail=f"Missing '{field_name}' file field")
+    except BaseException:
+        tmp.close()
+        os.unlink(tmp.name)
+        raise
+
+    return Path(tmp.name), digest.hexdigest(), state["size"]
+
+@api_router.post("/uploads/images", status_code=201)
+async def upload_image(request: Request, admin: dict = Depends(get_current_admin)):
+    # Pillow is only needed here and in the image workers, so keep it out of import time
+    from PIL import Image, UnidentifiedImageError
+    
+    tmp_path, image_hash, size = await stream_upload_to_disk(request)
+    name = f"{image_hash}.webp"
+    thumb_name = f"{image_hash}_thumb.webp"
+    try:
+        if not ((UPLOAD_DIR / name).exists() and (UPLOAD_DIR / thumb_name).exists()):
+            loop = asyncio.get_running_loop()
+            try:
+                await loop.run_in_executor(get_image_pool(), render_image_variants, str(tmp_path), image_hash)
+            except (UnidentifiedImageError, OSError, Image.DecompressionBombError):
+                raise HTTPException(status_code=400, detail="Uploaded file is not a supported image")
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+    audit_log.record(admin, "image.upload", "image", image_hash, {"size": size})
+    return {
+        "id": image_hash,
+        "size": size,
+        "url": image_url(name),
+        "thumbnail_url": image_url(thumb_name),
+    }
+
+@api_router.get("/uploads/images/{filename}")
+async def get_uploaded_image(filename: str):
+    if not IMAGE_NAME_PATTERN.match(filename):
+        raise HTTPException(status_code=404, detail="Image not found")
+    path = UPLOAD_DIR / filename
+    if not path.exists():
+        raise HTTPException(status_code=404, detail="Image not found")
+    return FileResponse(path, media_type="image/webp", headers={"Cache-Control": IMAGE_CACHE_CONTROL})
+
 # =============================================================================
 # ADMIN ROUTES
 # =============================================================================
 
 @api_router.get("/admin/stats")
-async def get_admin_stats(admin: dict = Depends(get_current_admin)):
-    total_alumni = await db.alumni.count_documents({"status": "approved"})
-    pending_registrations = await db.alumni.count_documents({"status": "pending"})
-    total_events = await db.events.count_documents({"is_active": True})
+async def get_admin_stats(admin: dict = Depends(get_current_admin), session: AsyncIOMotorClientSession = Depends(get_admin_session)):
+    total_alumni = await causal_db.alumni.count_documents({"status": "approved"}, session=session)
+    pending_registrations = await causal_db.alumni.count_documents({"status": "pending"}, session=session)
+    total_events = await causal_db.events.count_documents({"is_active": True}, session=session)
     
     # Get batch distribution
     pipeline = [
@@ -571,7 +1912,7 @@ async def get_admin_stats(admin: dict = Depends(get_current_admin)):
         {"$sort": {"_id": -1}},
         {"$limit": 10}
     ]
-    batch_distribution = await db.alumni.aggregate(pipeline).to_list(10)
+    batch_distribution = await causal_db.alumni.aggregate(pipeline, session=session).to_list(10)
     
     return {
         "total_alumni": total_alumni,
@@ -581,20 +1922,509 @@ async def get_admin_stats(admin: dict = Depends(get_current_admin)):
     }
 
 @api_router.get("/admin/notifications")
-async def get_notifications(admin: dict = Depends(get_current_admin)):
-    notifications = await db.notifications.find({}, {"_id": 0}).sort("created_at", -1).to_list(50)
+async def get_notifications(admin: dict = Depends(get_current_admin), session: AsyncIOMotorClientSession = Depends(get_admin_session)):
+    notifications = await causal_db.notifications.find({}, {"_id": 0}, session=session).sort("created_at", -1).to_list(50)
     return notifications
 
 @api_router.put("/admin/notifications/{notif_id}/read")
-async def mark_notification_read(notif_id: str, admin: dict = Depends(get_current_admin)):
-    await db.notifications.update_one({"id": notif_id}, {"$set": {"is_read": True}})
+async def mark_notification_read(notif_id: str, admin: dict = Depends(get_current_admin), session: AsyncIOMotorClientSession = Depends(get_admin_session)):
+    await db.notifications.update_one({"id": notif_id}, {"$set": {"is_read": True}}, session=session)
+    audit_log.record(admin, "notification.read", "notification", notif_id)
     return {"message": "Notification marked as read"}
 
+# =============================================================================
+# ANALYTICS
+# =============================================================================
+
+# Charts are served from rollups rather than aggregations over the alumni
+# collection. analytics_daily holds one document per day with registration,
+# approval and rejection counts plus summed approval turnaround;
+# analytics_breakdowns holds one document per (dimension, value) with
+# registered and approved counts. Each state transition increments them, and
+# rebuild_analytics() recomputes everything from the source collections.
+
+BREAKDOWN_FIELDS = {
+    "country": "country",
+    "state": "state",
+    "city": "city",
+    "house": "last_house",
+    "batch": "year_of_leaving",
+}
+def analytics_day(moment: datetime) -> str:
+    return as_utc(moment).astimezone(ANALYTICS_TIMEZONE).date().isoformat()
+
+def breakdown_key(dimension: str, value) -> str:
+    return f"{dimension}:{str(value).strip().lower()}"
+
+def analytics_increments(alumni: dict, transition: str, at: datetime) -> Tuple[str, dict, str]:
+    """Return (day, daily $inc, breakdown counter) for one transition"""
+    if transition == "registration":
+        return analytics_day(at), {"registrations": 1}, "registered"
+    if transition == "approval":
+        daily_inc = {"approvals": 1}
+        if isinstance(alumni.get("created_at"), datetime):
+            daily_inc["turnaround_seconds"] = (as_utc(at) - as_utc(alumni["created_at"])).total_seconds()
+            daily_inc["turnaround_count"] = 1
+        return analytics_day(at), daily_inc, "approved"
+    return analytics_day(at), {"rejections": 1}, None
+
+async def record_analytics(alumni: dict, transition: str, at: datetime):
+    """Fold a registration, approval or rejection into the rollups"""
+    try:
+        day, daily_inc, counter = analytics_increments(alumni, transition, at)
+        await db.analytics_daily.update_one({"_id": day}, {"$inc": daily_inc}, upsert=True)
+        if counter:
+            await db.analytics_breakdowns.bulk_write([
+                UpdateOne(
+                    {"_id": breakdown_key(dimension, alumni.get(field, ""))},
+                    {"$inc": {counter: 1}, "$setOnInsert": {"dimension": dimension, "value": alumni.get(field, "")}},
+                    upsert=True
+                )
+                for dimension, field in BREAKDOWN_FIELDS.items()
+            ], ordered=False)
+    except Exception:
+        # The transition itself already succeeded; a rebuild will pick this up
+        logger.exception(f"Failed to record {transition} analytics for {alumni.get('id')}")
+
+async def rebuild_analytics() -> dict:
+    """Recompute the rollups from alumni and alumni_archive"""
+    daily: Dict[str, Dict[str, float]] = {}
+    breakdowns: Dict[str, dict] = {}
+    for collection in ("alumni", "alumni_archive"):
+        async for alumni in db[collection].find({}, {"_id": 0, "duplicate_keys": 0, "possible_duplicates": 0}):
+            transitions = [("registration", alumni.get("created_at"))]
+            if alumni.get("status") == "approved":
+                transitions.append(("approval", alumni.get("approved_at")))
+            elif alumni.get("status") == "rejected":
+                transitions.append(("rejection", alumni.get("rejected_at")))
+            for transition, at in transitions:
+                if not isinstance(at, datetime):
+                    continue
+                day, daily_inc, counter = analytics_increments(alumni, transition, at)
+                for field, amount in daily_inc.items():
+                    daily.setdefault(day, {}).setdefault(field, 0)
+                    daily[day][field] += amount
+                if not counter:
+                    continue
+                for dimension, field in BREAKDOWN_FIELDS.items():
+                    value = alumni.get(field, "")
+                    entry = breakdowns.setdefault(breakdown_key(dimension, value), {"dimension": dimension, "value": value})
+                    entry[counter] = entry.get(counter, 0) + 1
+    
+    await db.analytics_daily.delete_many({"_id": {"$nin": list(daily)}})
+    await db.analytics_breakdowns.delete_many({"_id": {"$nin": list(breakdowns)}})
+    if daily:
+        await db.analytics_daily.bulk_write([ReplaceOne({"_id": day}, counts, upsert=True) for day, counts in daily.items()])
+    if breakdowns:
+        await db.analytics_breakdowns.bulk_write([ReplaceOne({"_id": key}, entry, upsert=True) for key, entry in breakdowns.items()])
+    return {"days": len(daily), "breakdowns": len(breakdowns)}
+
+@api_router.get("/admin/analytics")
+async def get_analytics(
+    start: Optional[date] = Query(None, alias="from"),
+    end: Optional[date] = Query(None, alias="to"),
+    top: int = Query(20, ge=1, le=200),
+    admin: dict = Depends(get_current_admin)
+):
+    end = end or datetime.now(ANALYTICS_TIMEZONE).date()
+    start = start or end - timedelta(days=89)
+    if start > end or (end - start).days > 3660:
+        raise HTTPException(status_code=400, detail="Date range must be between 1 day and 10 years")
+    
+    rollups = await db.analytics_daily.find(
+        {"_id": {"$gte": start.isoformat(), "$lte": end.isoformat()}}
+    ).to_list(None)
+    by_day = {r["_id"]: r for r in rollups}
+    daily = []
+    for offset in range((end - start).days + 1):
+        day = (start + timedelta(days=offset)).isoformat()
+        counts = by_day.get(day, {})
+        daily.append({field: counts.get(field, 0) for field in ("registrations", "approvals", "rejections")} | {"date": day})
+    
+    approvals = sum(r.get("approvals", 0) for r in rollups)
+    turnaround_count = sum(r.get("turnaround_count", 0) for r in rollups)
+    turnaround_seconds = sum(r.get("turnaround_seconds", 0) for r in rollups)
+    
+    breakdowns = {}
+    for dimension in BREAKDOWN_FIELDS:
+        rows = await db.analytics_breakdowns.find(
+            {"dimension": dimension}, {"_id": 0, "dimension": 0}
+        ).sort("approved", -1).limit(top).to_list(top)
+        breakdowns[dimension] = [{"value": r["value"], "registered": r.get("registered", 0), "approved": r.get("approved", 0)} for r in rows]
+    
+    return {
+        "from": start,
+        "to": end,
+        "daily": daily,
+        "approval_turnaround": {
+            "approvals": approvals,
+            "average_hours": round(turnaround_seconds / turnaround_count / 3600, 2) if turnaround_count else None,
+        },
+        "breakdowns": breakdowns,
+    }
+
+@api_router.post("/admin/analytics/rebuild")
+async def trigger_analytics_rebuild(admin: dict = Depends(get_current_admin)):
+    audit_log.record(admin, "analytics.rebuild", "analytics")
+    return await rebuild_analytics()
+
+# =============================================================================
+# ARCHIVAL
+# =============================================================================
+
+# Rejected registrations and read notifications are never looked at again, but
+# left in place they bloat every status scan and the working set. A background
+# job moves them into *_archive collections in throttled batches.
+
+# A run holds the "archive" lease while it works, renewing it every batch, and
+# its progress lives in job_progress so every worker reports the same state.
+ARCHIVE_LEASE_SECONDS = 300
+
+ARCHIVE_IDLE_PROGRESS = {
+    "state": "idle",  # idle, running, failed, interrupted
+    "last_started_at": None,
+    "last_finished_at": None,
+    "last_error": None,
+    "moved": {"alumni": 0, "notifications": 0},
+}
+
+async def acquire_job_lease(name: str, ttl_seconds: int, holder: str = WORKER_ID) -> bool:
+    """Take or renew a lease so only one worker runs a background job at a time"""
+    now = datetime.now(timezone.utc)
+    try:
+        result = await db.job_leases.update_one(
+            {"_id": name, "$or": [{"expires_at": {"$lt": now}}, {"holder": holder}]},
+            {"$set": {"holder": holder, "expires_at": now + timedelta(seconds=ttl_seconds)}},
+            upsert=True
+        )
+    except DuplicateKeyError:
+        return False
+    return result.matched_count == 1 or result.upserted_id is not None
+
+async def release_job_lease(name: str, holder: str = WORKER_ID):
+    await db.job_leases.delete_one({"_id": name, "holder": holder})
+
+def new_archive_run() -> str:
+    # Each run holds the lease under its own id, so a second run on the same worker is refused too
+    return f"{WORKER_ID}:{uuid.uuid4().hex[:8]}"
+
+async def get_archive_progress() -> dict:
+    progress = await db.job_progress.find_one({"_id": "archive"}, {"_id": 0})
+    if not progress:
+        return dict(ARCHIVE_IDLE_PROGRESS)
+    if progress["state"] == "running":
+        lease = await db.job_leases.find_one({"_id": "archive"})
+        if not lease or as_utc(lease["expires_at"]) < datetime.now(timezone.utc):
+            # The worker running it died without recording the outcome
+            progress["state"] = "interrupted"
+    return progress
+
+async def archive_collection(run_id: str, name: str, query: dict) -> int:
+    """Move matching documents from name to name_archive in throttled batches"""
+    hot, archive = db[name], db[f"{name}_archive"]
+    moved = 0
+    while True:
+        if not await acquire_job_lease("archive", ARCHIVE_LEASE_SECONDS, run_id):
+            raise RuntimeError("Archive lease was taken over by another run")
+        started = time.monotonic()
+        batch = await hot.find(query).limit(ARCHIVE_BATCH_SIZE).to_list(ARCHIVE_BATCH_SIZE)
+        if not batch:
+            return moved
+        
+        # Upserting by _id keeps a batch safe to replay if we stop between the two writes
+        now = datetime.now(timezone.utc)
+        await archive.bulk_write(
+            [ReplaceOne({"_id": doc["_id"]}, {**doc, "archived_at": now}, upsert=True) for doc in batch],
+            ordered=False
+        )
+        await hot.delete_many({"_id": {"$in": [doc["_id"] for doc in batch]}})
+        await record_tombstones(name, [doc["id"] for doc in batch if "id" in doc])
+        moved += len(batch)
+        await db.job_progress.update_one({"_id": "archive"}, {"$inc": {f"moved.{name}": len(batch)}})
+        
+        # Stay under the I/O budget: a batch of n documents takes at least n / budget seconds
+        budget_seconds = len(batch) / ARCHIVE_MAX_DOCS_PER_SECOND
+        await asyncio.sleep(max(0.0, budget_seconds - (time.monotonic() - started)))
+
+async def run_archive_job(run_id: str):
+    """Archive old documents; the caller must already hold the "archive" lease as run_id"""
+    now = datetime.now(timezone.utc)
+    rejected_cutoff = now - timedelta(days=ARCHIVE_REJECTED_AFTER_DAYS)
+    notifications_cutoff = now - timedelta(days=ARCHIVE_READ_NOTIFICATIONS_AFTER_DAYS)
+    
+    await db.job_progress.update_one({"_id": "archive"}, {"$set": {
+        "state": "running",
+        "run_id": run_id,
+        "last_started_at": now,
+        "last_error": None,
+        "moved": {"alumni": 0, "notifications": 0},
+    }}, upsert=True)
+    outcome = {"state": "idle"}
+    try:
+        await archive_collection(run_id, "alumni", {
+            "status": "rejected",
+            "$or": [
+                {"rejected_at": {"$lt": rejected_cutoff}},
+                # Rejected before rejected_at was recorded
+                {"rejected_at": {"$exists": False}, "created_at": {"$lt": rejected_cutoff}},
+            ]
+        })
+        await archive_collection(run_id, "notifications", {"is_read": True, "created_at": {"$lt": notifications_cutoff}})
+    except Exception as e:
+        outcome = {"state": "failed", "last_error": str(e)}
+        logger.exception("Archive job failed")
+    finally:
+        outcome["last_finished_at"] = datetime.now(timezone.utc)
+        await db.job_progress.update_one({"_id": "archive"}, {"$set": outcome})
+        await release_job_lease("archive", run_id)
+
+async def archive_loop():
+    interval = ARCHIVE_INTERVAL_MINUTES * 60
+    while True:
+        try:
+            # Every worker runs this loop; whichever finds the last run old enough and wins the lease runs it
+            progress = await get_archive_progress()
+            last_started = progress.get("last_started_at")
+            due = last_started is None or as_utc(last_started) <= datetime.now(timezone.utc) - timedelta(seconds=interval)
+            run_id = new_archive_run()
+            if due and await acquire_job_lease("archive", ARCHIVE_LEASE_SECONDS, run_id):
+                await run_archive_job(run_id)
+        except Exception:
+            logger.exception("Archive scheduler failed to start a run")
+        await asyncio.sleep(interval)
+
+@api_router.get("/admin/archive")
+async def get_archive_status(admin: dict = Depends(get_current_admin)):
+    return await get_archive_progress()
+
+@api_router.post("/admin/archive/run", status_code=202)
+async def trigger_archive_job(admin: dict = Depends(get_current_admin)):
+    # The lease keeps a manual run from overlapping a scheduled one on any worker
+    run_id = new_archive_run()
+    if not await acquire_job_lease("archive", ARCHIVE_LEASE_SECONDS, run_id):
+        raise HTTPException(status_code=409, detail="Archive job is already running")
+    try:
+        lifecycle.spawn(run_archive_job(run_id))
+    except HTTPException:
+        await release_job_lease("archive", run_id)
+        raise
+    audit_log.record(admin, "archive.run", "archive")
+    return {"message": "Archive job started"}
+
+# =============================================================================
+# ADMIN DIGEST
+# =============================================================================
+
+# In digest mode registrations only record a notification; this job emails the
+# admin one summary of the unsent ones once DIGEST_MAX_REGISTRATIONS have
+# accumulated or the oldest has waited DIGEST_INTERVAL_MINUTES.
+
+digest_wakeup = ContextProxy(lambda: get_runtime().digest_wakeup)
+
+async def send_admin_digest(force: bool = False) -> int:
+    """Email pending registration notifications if a digest is due; returns how many were sent"""
+    # Each call holds the lease under its own id and reads the unsent notifications
+    # only once it has it, so no two calls (on any worker) email the same ones
+    holder = f"{WORKER_ID}:{uuid.uuid4().hex[:8]}"
+    if not await acquire_job_lease("admin_digest", 60, holder):
+        return 0
+    try:
+        pending = await db.notifications.find(
+            {"type": "registration", "emailed": False}, {"_id": 0}
+        ).sort("created_at", 1).to_list(DIGEST_MAX_REGISTRATIONS)
+        if not pending:
+            return 0
+        oldest_due = as_utc(pending[0]["created_at"]) <= datetime.now(timezone.utc) - timedelta(minutes=DIGEST_INTERVAL_MINUTES)
+        if not (force or oldest_due or len(pending) >= DIGEST_MAX_REGISTRATIONS):
+            return 0
+        
+        ids = [n["id"] for n in pending]
+        registrations = await db.alumni.find({"id": {"$in": [n["alumni_id"] for n in pending]}}, {"_id": 0}).to_list(len(pending))
+        if registrations and not await run_in_threadpool(send_registration_digest, registrations):
+            return 0
+        await db.notifications.update_many({"id": {"$in": ids}}, {"$set": {"emailed": True}})
+        return len(ids)
+    finally:
+        await release_job_lease("admin_digest", holder)
+
+async def digest_loop():
+    # Check at least once a minute so interval-based digests go out on time
+    poll_seconds = min(60, DIGEST_INTERVAL_MINUTES * 60)
+    while True:
+        # Not asyncio.wait_for, which can swallow a shutdown cancellation that races with a wakeup (Python 3.11)
+        waiter = asyncio.ensure_future(digest_wakeup.wait())
+        try:
+            await asyncio.wait({waiter}, timeout=poll_seconds)
+        finally:
+            waiter.cancel()
+        digest_wakeup.clear()
+        try:
+            while await send_admin_digest() >= DIGEST_MAX_REGISTRATIONS:
+                pass
+        except Exception:
+            logger.exception("Admin digest failed")
+
+@api_router.post("/admin/digest/send")
+async def send_digest_now(admin: dict = Depends(get_current_admin)):
+    audit_log.record(admin, "digest.send", "digest")
+    return {"sent": await send_admin_digest(force=True)}
+
+# =============================================================================
+# MIGRATIONS
+# =============================================================================
+
+# Data migrations run in the background after startup so the app stays online
+# while they work. Each one walks its collections in _id order, applies small
+# batches with bulk writes and checkpoints the last _id it finished, so a
+# restart resumes where it stopped. Progress is kept in the migrations
+# collection, keyed by version.
+
+async def migrate_in_batches(version: int, collection: str, query: dict, transform) -> int:
+    """Apply transform(doc) -> {field: new value} to every document matching query.
+
+    Updates are compare-and-set on the fields being replaced, so a document the
+    app rewrote mid-migration is left alone.
+    """
+    state = await db.migrations.find_one({"_id": version}, {"checkpoints": 1}) or {}
+    last_id = state.get("checkpoints", {}).get(collection)
+    migrated = 0
+    while True:
+        if not await acquire_job_lease("migrations", 300):
+            raise RuntimeError("Migration lease was taken over by another worker")
+        batch_query = {**query, "_id": {"$gt": last_id}} if last_id is not None else query
+        batch = await db[collection].find(batch_query).sort("_id", 1).limit(MIGRATION_BATCH_SIZE).to_list(MIGRATION_BATCH_SIZE)
+        if not batch:
+            return migrated
+        
+        updates = []
+        for doc in batch:
+            changes = transform(doc)
+            if changes:
+                expected = {field: doc[field] if field in doc else {"$exists": False} for field in changes}
+                updates.append(UpdateOne({"_id": doc["_id"], **expected}, {"$set": changes}))
+        if updates:
+            await db[collection].bulk_write(updates, ordered=False)
+        
+        migrated += len(updates)
+        last_id = batch[-1]["_id"]
+        await db.migrations.update_one(
+            {"_id": version},
+            {"$set": {f"checkpoints.{collection}": last_id}, "$inc": {"migrated": len(updates)}}
+        )
+
+def parse_stored_timestamp(value) -> Optional[datetime]:
+    if not isinstance(value, str):
+        return None
+    try:
+        return as_utc(datetime.fromisoformat(value))
+    except ValueError:
+        return None
+
+async def migrate_event_start_at(version: int):
+    # Events created before start_at existed only have free-form date/time strings
+    await migrate_in_batches(version, "events", {"start_at": {"$exists": False}}, lambda event: {
+        "start_at": parse_event_start(event.get("date", ""), event.get("time", ""))
+    })
+
+async def backfill_duplicate_keys(version: int):
+    # Registrations made before duplicate detection have no blocking keys yet
+    await migrate_in_batches(version, "alumni", {"duplicate_keys": {"$exists": False}}, lambda alumni: {
+        "duplicate_keys": duplicate_blocking_keys(alumni)
+    })
+
+TIMESTAMP_FIELDS = {
+    "alumni": ["created_at", "approved_at", "rejected_at"],
+    "alumni_archive": ["created_at", "approved_at", "rejected_at"],
+    "notifications": ["created_at"],
+    "notifications_archive": ["created_at"],
+    "events": ["created_at"],
+    "event_rsvps": ["created_at"],
+    "admins": ["created_at"],
+}
+
+async def migrate_timestamps_to_dates(version: int):
+    # Timestamps used to be written as ISO strings; store them as native BSON dates
+    for collection, fields in TIMESTAMP_FIELDS.items():
+        query = {"$or": [{field: {"$type": "string"}} for field in fields]}
+        await migrate_in_batches(version, collection, query, lambda doc, fields=fields: {
+            field: parsed
+            for field in fields
+            if (parsed := parse_stored_timestamp(doc.get(field))) is not None
+        })
+
+async def backfill_updated_at(version: int):
+    # Delta sync needs every document to carry updated_at
+    for collection in sorted(DELTA_SYNC_COLLECTIONS):
+        await migrate_in_batches(version, collection, {"updated_at": {"$exists": False}}, lambda doc: {
+            "updated_at": doc.get("created_at") or datetime.now(timezone.utc)
+        })
+
+MIGRATIONS = [
+    (1, "event_start_at", migrate_event_start_at),
+    (2, "alumni_duplicate_keys", backfill_duplicate_keys),
+    (3, "timestamps_to_dates", migrate_timestamps_to_dates),
+    (4, "updated_at", backfill_updated_at),
+]
+
+async def run_migrations():
+    if not await acquire_job_lease("migrations", 300):
+        return
+    for version, name, migrate in MIGRATIONS:
+        state = await db.migrations.find_one({"_id": version}, {"state": 1})
+        if state and state.get("state") == "done":
+            continue
+        await db.migrations.update_one(
+            {"_id": version},
+            {"$set": {"name": name, "state": "running", "started_at": datetime.now(timezone.utc)}},
+            upsert=True
+        )
+        try:
+            await migrate(version)
+        except Exception as e:
+            await db.migrations.update_one({"_id": version}, {"$set": {"state": "failed", "error": str(e)}})
+            logger.exception(f"Migration {version} ({name}) failed")
+            return
+        await db.migrations.update_one(
+            {"_id": version},
+            {"$set": {"state": "done", "finished_at": datetime.now(timezone.utc)}, "$unset": {"error": ""}}
+        )
+        logger.info(f"Migration {version} ({name}) complete")
+
+@api_router.get("/admin/migrations")
+async def get_migrations(admin: dict = Depends(get_current_admin)):
+    return await db.migrations.find({}, {"checkpoints": 0}).sort("_id", 1).to_list(100)
+
 # =============================================================================
 # SEED DATA
 # =============================================================================
 
-@app.on_event("startup")
+async def create_indexes():
+    # Index builds are independent, so issue them all at once
+    indexes = [
+        (db.idempotency_keys, "expires_at", {"expireAfterSeconds": 0}),
+        (db.alumni, "duplicate_keys", {}),
+        (db.alumni, [("status", 1), ("rejected_at", 1)], {}),
+        (db.notifications, [("is_read", 1), ("created_at", 1)], {}),
+        (db.notifications, [("type", 1), ("emailed", 1), ("created_at", 1)], {}),
+        (db.events, [("is_active", 1), ("start_at", 1)], {}),
+        *[(db[collection], "updated_at", {}) for collection in DELTA_SYNC_COLLECTIONS],
+        (db.tombstones, [("collection", 1), ("deleted_at", 1)], {}),
+        (db.tombstones, "deleted_at", {"expireAfterSeconds": TOMBSTONE_RETENTION_DAYS * 86400}),
+        (db.analytics_breakdowns, [("dimension", 1), ("approved", -1)], {}),
+        (db.audit_log, [("admin_email", 1), ("at", -1)], {}),
+        (db.audit_log, [("target_type", 1), ("target_id", 1), ("at", -1)], {}),
+        (db.audit_log, [("at", -1)], {}),
+        (db.event_rsvps, [("event_id", 1), ("email", 1)], {"unique": True}),
+        (db.event_rsvps, [("event_id", 1), ("status", 1), ("waitlist_number", 1)], {}),
+    ]
+    if RATE_LIMIT_BACKEND == "mongo":
+        indexes.append((db.rate_limits, "expires_at", {"expireAfterSeconds": 0}))
+    await asyncio.gather(*[collection.create_index(keys, **options) for collection, keys, options in indexes])
+
+async def warm_up():
+    # Open the first pooled connection so the first request skips server selection and the handshake
+    await db.command("ping")
+
 async def seed_admin():
     # Seed admin account only
     admin_email = "deweshkk@gmail.com"
@@ -603,13 +2433,235 @@ async def seed_admin():
         admin_doc = {
             "id": str(uuid.uuid4()),
             "email": admin_email,
-            "password": hash_password("Dew@2002k"),
+            "password": await run_in_threadpool(hash_password, "Dew@2002k"),
             "role": "admin",
-            "created_at": datetime.now(timezone.utc).isoformat()
+            "created_at": datetime.now(timezone.utc)
         }
         await db.admins.insert_one(admin_doc)
         logger.info(f"Admin account seeded: {admin_email}")
 
+# =============================================================================
+# RESPONSE COMPRESSION
+# =============================================================================
+
+COMPRESSIBLE_TYPES = ("application/json", "text/", "application/javascript", "image/svg+xml")
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """Pick br or gzip from an Accept-Encoding header, honouring q=0 exclusions"""
+    accepted = {}
+    for part in accept_encoding.lower().split(","):
+        coding, _, params = part.strip().partition(";")
+        quality = 1.0
+        if params.strip().startswith("q="):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[coding.strip()] = quality
+    if brotli is not None and accepted.get("br", 0) > 0:
+        return "br"
+    if accepted.get("gzip", accepted.get("*", 0)) > 0:
+        return "gzip"
+    return None
+
+def compress_body(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL)
+
+class CompressionMiddleware:
+    """Compress complete, compressible responses above a size threshold.
+
+    Streaming responses (more than one body message) and small bodies are passed
+    through untouched, since compressing them costs more than it saves.
+    """
+
+    def __init__(self, app, minimum_size: int = COMPRESSION_MIN_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+
+        async def send_compressed(message):
+            nonlocal start_message
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+            if message["type"] != "http.response.body" or start_message is None:
+                await send(message)
+                return
+
+            start, start_message = start_message, None
+            body = message.get("body", b"")
+            headers = MutableHeaders(raw=start["headers"])
+            content_type = headers.get("content-type", "")
+            if (
+                message.get("more_body", False)
+                or len(body) < self.minimum_size
+                or "content-encoding" in headers
+                or not content_type.startswith(COMPRESSIBLE_TYPES)
+            ):
+                await send(start)
+                await send(message)
+                return
+
+            if len(body) > 64 * 1024:
+                compressed = await run_in_threadpool(compress_body, body, encoding)
+            else:
+                compressed = compress_body(body, encoding)
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(compressed))
+            headers.add_vary_header("Accept-Encoding")
+            await send(start)
+            await send({"type": "http.response.body", "body": compressed})
+
+        await self.app(scope, receive, send_compressed)
+
+# =============================================================================
+# LIFECYCLE
+# =============================================================================
+
+# Startup and shutdown run through a FastAPI lifespan. Background work goes
+# through the Lifecycle object: long-running loops are registered as services
+# and one-off jobs are spawned as tracked tasks. On shutdown we stop taking new
+# background work, stop the schedulers, give running jobs until the drain
+# deadline (archive runs and migrations resume from where they stopped if they
+# have to be cancelled), flush the audit queue or spill it to disk, and only
+# then close the Mongo client.
+#
+# Startup work that does not depend on each other (index builds, seeding the
+# admin account, opening the first connection) runs concurrently.
+
+class Lifecycle:
+    """Track background work so shutdown can drain it before closing Mongo"""
+    
+    def __init__(self):
+        self.accepting = False
+        self.services: Dict[str, asyncio.Task] = {}
+        self.tasks: set = set()
+    
+    def start_service(self, name: str, coro):
+        """Run a long-lived loop until shutdown"""
+        self.services[name] = asyncio.create_task(coro, name=name)
+    
+    def spawn(self, coro) -> asyncio.Task:
+        """Run one-off background work that shutdown waits for"""
+        if not self.accepting:
+            coro.close()
+            raise HTTPException(status_code=503, detail="Server is shutting down", headers={"Retry-After": "5"})
+        task = asyncio.create_task(coro)
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+        return task
+    
+    async def stop_services(self, *names: str):
+        tasks = [self.services.pop(name) for name in names if name in self.services]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+    
+    async def drain(self, timeout: float) -> int:
+        """Wait for spawned tasks until the timeout, then cancel the rest; returns how many were cancelled"""
+        pending = set(self.tasks)
+        if pending and timeout > 0:
+            _, pending = await asyncio.wait(pending, timeout=timeout)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        return len(pending)
+
+lifecycle = ContextProxy(lambda: get_runtime().lifecycle)
+
+class AppRuntime:
+    """Everything one app instance owns: its Mongo connection, background work and buffers"""
+    
+    def __init__(self, settings: Settings):
+        self.settings = settings
+        self.mongo = MongoConnection(settings)
+        self.rate_limit_store = MongoTokenBucketStore() if RATE_LIMIT_BACKEND == "mongo" else MemoryTokenBucketStore()
+        self.image_pool: Optional[ProcessPoolExecutor] = None
+        self.reset()
+    
+    def reset(self):
+        """Create fresh per-run state.
+
+        asyncio primitives bind to the event loop that first uses them, and an app
+        may be started more than once on different loops (as test clients do), so
+        every startup gets new ones.
+        """
+        self.lifecycle = Lifecycle()
+        self.audit_log = AuditLog(AUDIT_QUEUE_SIZE, AUDIT_BATCH_SIZE, AUDIT_FLUSH_INTERVAL_SECONDS)
+        self.read_coalescer = SingleFlight()
+        self.expensive_handlers = ConcurrencyLimiter(EXPENSIVE_CONCURRENCY_LIMIT, EXPENSIVE_QUEUE_TIMEOUT)
+        self.digest_wakeup = asyncio.Event()
+
+class RuntimeMiddleware:
+    """Make the app's runtime current while it serves a request"""
+    
+    def __init__(self, app, runtime: AppRuntime):
+        self.app = app
+        self.runtime = runtime
+    
+    async def __call__(self, scope, receive, send):
+        token = current_runtime.set(self.runtime)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            current_runtime.reset(token)
+
+@contextlib.asynccontextmanager
+async def lifespan(app: FastAPI):
+    runtime: AppRuntime = app.state.runtime
+    runtime.reset()
+    settings = runtime.settings
+    lifecycle = runtime.lifecycle
+    audit_log = runtime.audit_log
+    # Background tasks copy the current context, so they keep using this runtime
+    token = current_runtime.set(runtime)
+    
+    startup = [create_indexes(), warm_up()]
+    if settings.seed_admin:
+        startup.append(seed_admin())
+    await asyncio.gather(*startup)
+    audit_log.restore_spilled()
+    
+    lifecycle.accepting = True
+    lifecycle.start_service("audit", audit_log.run())
+    if settings.background_jobs:
+        if ARCHIVE_ENABLED:
+            lifecycle.start_service("archive", archive_loop())
+        if ADMIN_EMAIL_MODE == "digest":
+            lifecycle.start_service("digest", digest_loop())
+        lifecycle.spawn(run_migrations())
+    
+    yield
+    
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + SHUTDOWN_DRAIN_SECONDS
+    lifecycle.accepting = False
+    # Unsent digest notifications stay marked in Mongo, so the next process picks them up
+    await lifecycle.stop_services("archive", "digest")
+    cancelled = await lifecycle.drain(deadline - loop.time())
+    if cancelled:
+        logger.warning(f"Cancelled {cancelled} background tasks still running at the shutdown deadline")
+    
+    await lifecycle.stop_services("audit")
+    await audit_log.flush(max(1.0, deadline - loop.time()))
+    if runtime.image_pool is not None:
+        runtime.image_pool.shutdown(wait=True)
+        runtime.image_pool = None
+    runtime.mongo.close()
+    current_runtime.reset(token)
+
 # =============================================================================
 # MAIN APP CONFIG
 # =============================================================================
@@ -618,15 +2670,39 @@ async def seed_admin():
 async def root():
     return {"message": "EHSAS API - Elden Heights School Alumni Society"}
 
-app.include_router(api_router)
+def create_app(settings: Optional[Settings] = None) -> FastAPI:
+    """Build an app instance with its own Mongo connection and background workers"""
+    runtime = AppRuntime(settings or Settings())
+    app = FastAPI(lifespan=lifespan)
+    app.state.runtime = runtime
+    
+    app.include_router(api_router)
+    app.add_middleware(CausalTokenMiddleware)
+    app.add_middleware(CompressionMiddleware)
+    app.add_middleware(
+        CORSMiddleware,
+        allow_credentials=True,
+        allow_origins=runtime.settings.cors_origins,
+        allow_methods=["*"],
+        allow_headers=["*"],
+        expose_headers=[CAUSAL_TOKEN_HEADER],
+    )
+    app.add_middleware(RuntimeMiddleware, runtime=runtime)
+    return app
+
+_default_app: Optional[FastAPI] = None
 
-app.add_middleware(
-    CORSMiddleware,
-    allow_credentials=True,
-    allow_origins=os.environ.get('CORS_ORIGINS', '*').split(','),
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+def get_default_app() -> FastAPI:
+    global _default_app
+    if _default_app is None:
+        _default_app = create_app()
+    return _default_app
+
+def __getattr__(name: str):
+    # `uvicorn server:app` builds the default app on first access, which keeps importing this module cheap
+    if name == "app":
+        return get_default_app()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 logging.basicConfig(
     level=logging.INFO,
@@ -634,6 +2710,10 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-@app.on_event("shutdown")
-async def shutdown_db_client():
-    client.close()
+if __name__ == "__main__":
+    # Backfill command: python server.py backfill-analytics
+    import sys
+    if sys.argv[1:] == ["backfill-analytics"]:
+        print(asyncio.run(rebuild_analytics()))
+    else:
+        print("usage: python server.py backfill-analytics")
@@ -2,8 +2,11 @@
 
 import requests
 import sys
+import io
 import json
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from PIL import Image
 
 class EHSASAPITester:
     def __init__(self, base_url="https://elden-alumni.preview.emergentagent.com/api"):
@@ -66,6 +69,55 @@ class EHSASAPITester:
             self.log_test("Admin Login", False, str(e))
             return False
 
+    def test_login_rate_limit(self):
+        """Test that repeated logins for one email are throttled with 429 and Retry-After"""
+        try:
+            # A throwaway email so the real admin account is never locked out
+            login_data = {
+                "email": f"test.ratelimit.{datetime.now().strftime('%H%M%S%f')}@example.com",
+                "password": "wrong-password"
+            }
+            statuses = []
+            retry_after = None
+            for _ in range(10):
+                response = requests.post(f"{self.base_url}/auth/admin/login", json=login_data, timeout=10)
+                statuses.append(response.status_code)
+                if response.status_code == 429:
+                    retry_after = response.headers.get("Retry-After")
+                    break
+            
+            success = statuses[0] == 401 and statuses[-1] == 429 and bool(retry_after) and int(retry_after) > 0
+            details = f"Statuses: {statuses}, Retry-After: {retry_after}"
+            self.log_test("Login Rate Limit", success, details)
+            return success
+        except Exception as e:
+            self.log_test("Login Rate Limit", False, str(e))
+            return False
+
+    def test_concurrent_reads(self):
+        """Test that concurrent identical list reads all get the same complete answer"""
+        try:
+            def read(params):
+                return requests.get(f"{self.base_url}/spotlight", params=params, timeout=30)
+            
+            # Alternate formats so coalescing has to keep differently-keyed reads apart
+            params = [{"format": "columnar"} if i % 2 else {} for i in range(30)]
+            with ThreadPoolExecutor(max_workers=len(params)) as pool:
+                responses = list(pool.map(read, params))
+            
+            expected_json = read({}).json()
+            expected_columnar = read({"format": "columnar"}).json()
+            consistent = all(
+                r.status_code == 200 and r.json() == (expected_columnar if p else expected_json)
+                for p, r in zip(params, responses)
+            )
+            details = f"{len(responses)} concurrent reads, consistent: {consistent}"
+            self.log_test("Concurrent Reads", consistent, details)
+            return consistent
+        except Exception as e:
+            self.log_test("Concurrent Reads", False, str(e))
+            return False
+
     def test_alumni_registration(self):
         """Test alumni registration"""
         try:
@@ -236,6 +288,70 @@ class EHSASAPITester:
             self.log_test("Admin Approve Alumni", False, str(e))
             return False
 
+    def test_approval_compare_and_set(self):
+        """Test that approve/reject apply once and that Idempotency-Key replays or rejects retries"""
+        if not self.admin_token:
+            self.log_test("Approval Compare-and-Set", False, "No admin token available")
+            return False
+        
+        headers = {"Authorization": f"Bearer {self.admin_token}"}
+        try:
+            def register(tag):
+                alumni = {
+                    "first_name": "Test",
+                    "last_name": f"Approval {tag}",
+                    "email": f"test.approval.{tag}.{datetime.now().strftime('%H%M%S%f')}@example.com",
+                    "mobile": "9876543211",
+                    "year_of_joining": 2010,
+                    "year_of_leaving": 2022,
+                    "class_of_joining": "1",
+                    "last_class_studied": "12",
+                    "last_house": "Blue House",
+                    "full_address": "456 Test Street",
+                    "city": "Pune",
+                    "pincode": "411001",
+                    "state": "Maharashtra",
+                    "country": "India",
+                    "profession": "Teacher",
+                    "organization": "Test School"
+                }
+                response = requests.post(f"{self.base_url}/alumni/register", json=alumni, timeout=10)
+                return response.json()["id"]
+            
+            # A second approval, or a rejection after approval, must not apply again
+            alumni_id = register("cas")
+            first = requests.put(f"{self.base_url}/alumni/{alumni_id}/approve", headers=headers, timeout=30)
+            second = requests.put(f"{self.base_url}/alumni/{alumni_id}/approve", headers=headers, timeout=30)
+            reject = requests.put(f"{self.base_url}/alumni/{alumni_id}/reject", headers=headers, timeout=30)
+            applied_once = (
+                first.status_code == 200
+                and bool(first.json().get("ehsas_id"))
+                and second.status_code == 409
+                and reject.status_code == 409
+            )
+            
+            # The same Idempotency-Key replays the first response, and cannot be reused on another route
+            alumni_id = register("key")
+            keyed = {**headers, "Idempotency-Key": f"test-approval-{alumni_id}"}
+            first = requests.put(f"{self.base_url}/alumni/{alumni_id}/approve", headers=keyed, timeout=30)
+            replay = requests.put(f"{self.base_url}/alumni/{alumni_id}/approve", headers=keyed, timeout=30)
+            other_route = requests.put(f"{self.base_url}/alumni/{alumni_id}/reject", headers=keyed, timeout=30)
+            replayed = (
+                first.status_code == 200
+                and replay.status_code == 200
+                and replay.headers.get("Idempotent-Replayed") == "true"
+                and replay.json() == first.json()
+                and other_route.status_code == 422
+            )
+            
+            success = applied_once and replayed
+            details = f"Applied once: {applied_once}, replayed: {replayed}"
+            self.log_test("Approval Compare-and-Set", success, details)
+            return success
+        except Exception as e:
+            self.log_test("Approval Compare-and-Set", False, str(e))
+            return False
+
     def test_admin_notifications(self):
         """Test getting admin notifications"""
         if not self.admin_token:
@@ -362,6 +478,279 @@ class EHSASAPITester:
             self.log_test("Events CRUD", False, str(e))
             return False
 
+    def test_list_formats_and_compression(self):
+        """Test the columnar list format and gzip on responses above the size threshold"""
+        if not self.admin_token:
+            self.log_test("List Formats and Compression", False, "No admin token available")
+            return False
+        
+        headers = {"Authorization": f"Bearer {self.admin_token}"}
+        created_ids = []
+        try:
+            # Enough spotlight entries to push the list well past COMPRESSION_MIN_SIZE (1 KB by default)
+            for i in range(8):
+                spotlight_data = {
+                    "name": f"Test Compression Alumni {i}",
+                    "batch": "2010",
+                    "profession": "Engineer",
+                    "achievement": "Led a long-running community project for the school alumni network. " * 3,
+                    "category": "Technology"
+                }
+                response = requests.post(f"{self.base_url}/spotlight", json=spotlight_data, headers=headers, timeout=10)
+                if response.status_code == 200:
+                    created_ids.append(response.json()["id"])
+            
+            response = requests.get(f"{self.base_url}/spotlight", headers={"Accept-Encoding": "gzip"}, timeout=10)
+            items = response.json()
+            gzipped = response.headers.get("Content-Encoding") == "gzip"
+            
+            # Small bodies are not worth compressing
+            small = requests.get(f"{self.base_url}/", headers={"Accept-Encoding": "gzip"}, timeout=10)
+            small_plain = "Content-Encoding" not in small.headers
+            
+            response = requests.get(f"{self.base_url}/spotlight", params={"format": "columnar"}, timeout=10)
+            columnar = response.json()
+            fields = columnar.get("fields", [])
+            rows_match = (
+                len(columnar.get("rows", [])) == len(items)
+                and [dict(zip(fields, row)) for row in columnar["rows"]] == items
+            )
+            
+            success = len(created_ids) == 8 and gzipped and small_plain and rows_match
+            details = f"Gzipped: {gzipped}, small left plain: {small_plain}, columnar rows match: {rows_match}"
+            self.log_test("List Formats and Compression", success, details)
+            return success
+        except Exception as e:
+            self.log_test("List Formats and Compression", False, str(e))
+            return False
+        finally:
+            for spotlight_id in created_ids:
+                requests.delete(f"{self.base_url}/spotlight/{spotlight_id}", headers=headers, timeout=10)
+
+    def test_delta_sync(self):
+        """Test that ?since= deltas report removals and reset stale cursors"""
+        if not self.admin_token:
+            self.log_test("Delta Sync", False, "No admin token available")
+            return False
+        
+        headers = {"Authorization": f"Bearer {self.admin_token}"}
+        try:
+            def cursor(path):
+                # A stale cursor returns a full snapshot plus a fresh cursor to continue from
+                response = requests.get(f"{self.base_url}{path}", params={"since": "2000-01-01T00:00:00Z"}, headers=headers, timeout=10)
+                data = response.json()
+                return data["since"], data["reset"]
+            
+            def delta(path, since):
+                response = requests.get(f"{self.base_url}{path}", params={"since": since}, headers=headers, timeout=10)
+                return response.json()
+            
+            # An approved registration leaves the pending list, so it comes back as deleted
+            since, stale_reset = cursor("/alumni/pending")
+            alumni = {
+                "first_name": "Test",
+                "last_name": "Delta",
+                "email": f"test.delta.{datetime.now().strftime('%H%M%S%f')}@example.com",
+                "mobile": "9876543212",
+                "year_of_joining": 2011,
+                "year_of_leaving": 2023,
+                "class_of_joining": "1",
+                "last_class_studied": "12",
+                "last_house": "Green House",
+                "full_address": "789 Test Street",
+                "city": "Pune",
+                "pincode": "411001",
+                "state": "Maharashtra",
+                "country": "India",
+                "profession": "Engineer",
+                "organization": "Test Company"
+            }
+            alumni_id = requests.post(f"{self.base_url}/alumni/register", json=alumni, timeout=10).json()["id"]
+            requests.put(f"{self.base_url}/alumni/{alumni_id}/approve", headers=headers, timeout=30)
+            pending = delta("/alumni/pending", since)
+            approved_removed = (
+                not pending["reset"]
+                and alumni_id in pending["deleted"]
+                and all(a["id"] != alumni_id for a in pending["changed"])
+            )
+            
+            # A deleted spotlight leaves a tombstone behind
+            since, _ = cursor("/spotlight")
+            spotlight = {
+                "name": "Test Delta Spotlight",
+                "batch": "2020",
+                "profession": "Software Engineer",
+                "achievement": "Tombstone check",
+                "category": "founder",
+                "image_url": "https://example.com/image.jpg"
+            }
+            spotlight_id = requests.post(f"{self.base_url}/spotlight", json=spotlight, headers=headers, timeout=10).json()["id"]
+            requests.delete(f"{self.base_url}/spotlight/{spotlight_id}", headers=headers, timeout=10)
+            featured = delta("/spotlight", since)
+            tombstoned = not featured["reset"] and spotlight_id in featured["deleted"]
+            
+            success = stale_reset and approved_removed and tombstoned
+            details = f"Stale cursor reset: {stale_reset}, approved removed: {approved_removed}, tombstoned: {tombstoned}"
+            self.log_test("Delta Sync", success, details)
+            return success
+        except Exception as e:
+            self.log_test("Delta Sync", False, str(e))
+            return False
+
+    def test_event_rsvp_concurrency(self):
+        """Test that simultaneous RSVPs never oversell a small event"""
+        if not self.admin_token:
+            self.log_test("Event RSVP Concurrency", False, "No admin token available")
+            return False
+        
+        headers = {"Authorization": f"Bearer {self.admin_token}"}
+        capacity = 5
+        attempts = 40
+        event_id = None
+        try:
+            event_data = {
+                "title": "Test Capacity Reunion",
+                "description": "Small reunion used to test RSVP capacity",
+                "event_type": "reunion",
+                "date": "2024-12-25",
+                "time": "6:00 PM",
+                "location": "School Campus",
+                "capacity": capacity
+            }
+            response = requests.post(f"{self.base_url}/events", json=event_data, headers=headers, timeout=10)
+            if response.status_code != 200:
+                self.log_test("Event RSVP Concurrency", False, f"Status: {response.status_code}, Response: {response.text}")
+                return False
+            event_id = response.json()["id"]
+            
+            def rsvp(i):
+                rsvp_data = {"name": f"Test Guest {i}", "email": f"test.guest.{i}.{event_id[:8]}@example.com"}
+                return requests.post(f"{self.base_url}/events/{event_id}/rsvp", json=rsvp_data, timeout=30)
+            
+            with ThreadPoolExecutor(max_workers=attempts) as pool:
+                responses = list(pool.map(rsvp, range(attempts)))
+            
+            statuses = [r.json().get("status") for r in responses if r.status_code == 201]
+            confirmed = statuses.count("confirmed")
+            waitlisted = statuses.count("waitlisted")
+            
+            # Repeating an RSVP reports its status but never the id that cancels it
+            repeat = rsvp(0)
+            repeat_hides_id = repeat.status_code == 200 and "id" not in repeat.json()
+            
+            # Cancelling a confirmed seat should promote the first waitlisted guest
+            cancelled = next(r.json() for r in responses if r.status_code == 201 and r.json()["status"] == "confirmed")
+            requests.delete(f"{self.base_url}/events/{event_id}/rsvp/{cancelled['id']}", timeout=10)
+            response = requests.get(f"{self.base_url}/events/{event_id}/rsvps", headers={**headers, "Accept-Encoding": "gzip"}, timeout=10)
+            rsvps = response.json()
+            confirmed_after_cancel = sum(1 for r in rsvps if r["status"] == "confirmed")
+            # Admin routes run in a causal session, and their responses must still be compressed
+            gzipped = response.headers.get("Content-Encoding") == "gzip"
+            
+            success = (
+                len(statuses) == attempts
+                and confirmed == capacity
+                and waitlisted == attempts - capacity
+                and confirmed_after_cancel == capacity
+                and gzipped
+                and repeat_hides_id
+            )
+            details = (
+                f"Confirmed: {confirmed}, Waitlisted: {waitlisted}, Confirmed after cancel: {confirmed_after_cancel}, "
+                f"Gzipped: {gzipped}, Repeat hides id: {repeat_hides_id}"
+            )
+            self.log_test("Event RSVP Concurrency", success, details)
+            return success
+        except Exception as e:
+            self.log_test("Event RSVP Concurrency", False, str(e))
+            return False
+        finally:
+            if event_id:
+                requests.delete(f"{self.base_url}/events/{event_id}", headers=headers, timeout=10)
+
+    def test_event_edit_keeps_capacity(self):
+        """Test that editing a capped event without capacity keeps its seat limit"""
+        if not self.admin_token:
+            self.log_test("Event Edit Keeps Capacity", False, "No admin token available")
+            return False
+        
+        headers = {"Authorization": f"Bearer {self.admin_token}"}
+        event_id = None
+        try:
+            event_data = {
+                "title": "Test Capped Reunion",
+                "description": "Reunion used to test capacity across edits",
+                "event_type": "reunion",
+                "date": "2024-12-26",
+                "time": "6:00 PM",
+                "location": "School Campus",
+                "capacity": 2
+            }
+            response = requests.post(f"{self.base_url}/events", json=event_data, headers=headers, timeout=10)
+            event_id = response.json()["id"]
+            
+            def rsvp(tag):
+                rsvp_data = {"name": f"Test Guest {tag}", "email": f"test.capacity.{tag}.{event_id[:8]}@example.com"}
+                return requests.post(f"{self.base_url}/events/{event_id}/rsvp", json=rsvp_data, timeout=10).json()["status"]
+            
+            before = [rsvp(i) for i in range(3)]
+            # An edit that leaves capacity out, as older clients do, must not lift the limit
+            edit = {key: value for key, value in event_data.items() if key != "capacity"}
+            edited = requests.put(f"{self.base_url}/events/{event_id}", json={**edit, "title": "Test Capped Reunion (edited)"}, headers=headers, timeout=10)
+            after = [rsvp(i) for i in range(3, 5)]
+            # Capacity cannot drop below the seats already taken
+            shrink = requests.put(f"{self.base_url}/events/{event_id}", json={**event_data, "capacity": 1}, headers=headers, timeout=10)
+            
+            success = (
+                before == ["confirmed", "confirmed", "waitlisted"]
+                and edited.status_code == 200
+                and after == ["waitlisted", "waitlisted"]
+                and shrink.status_code == 409
+            )
+            details = f"Before edit: {before}, after edit: {after}, shrink below taken seats: {shrink.status_code}"
+            self.log_test("Event Edit Keeps Capacity", success, details)
+            return success
+        except Exception as e:
+            self.log_test("Event Edit Keeps Capacity", False, str(e))
+            return False
+        finally:
+            if event_id:
+                requests.delete(f"{self.base_url}/events/{event_id}", headers=headers, timeout=10)
+
+    def test_image_upload(self):
+        """Test image upload, deduplication and cached serving"""
+        if not self.admin_token:
+            self.log_test("Image Upload", False, "No admin token available")
+            return False
+        
+        try:
+            headers = {"Authorization": f"Bearer {self.admin_token}"}
+            buffer = io.BytesIO()
+            Image.new("RGB", (1200, 800), (139, 28, 58)).save(buffer, "PNG")
+            files = {"file": ("test.png", buffer.getvalue(), "image/png")}
+            
+            response = requests.post(f"{self.base_url}/uploads/images", files=files, headers=headers, timeout=30)
+            if response.status_code != 201:
+                self.log_test("Image Upload", False, f"Status: {response.status_code}, Response: {response.text}")
+                return False
+            uploaded = response.json()
+            
+            # Uploading the same bytes again must resolve to the same content-addressed URL
+            response = requests.post(f"{self.base_url}/uploads/images", files=files, headers=headers, timeout=30)
+            same_url = response.status_code == 201 and response.json().get("url") == uploaded["url"]
+            
+            base = self.base_url[:-len("/api")]
+            response = requests.get(f"{base}{uploaded['thumbnail_url']}", timeout=10)
+            cached = response.status_code == 200 and "immutable" in response.headers.get("Cache-Control", "")
+            
+            success = same_url and cached
+            details = f"URL: {uploaded['url']}, deduplicated: {same_url}, immutable: {cached}"
+            self.log_test("Image Upload", success, details)
+            return success
+        except Exception as e:
+            self.log_test("Image Upload", False, str(e))
+            return False
+
     def run_all_tests(self):
         """Run all tests in sequence"""
         print("🚀 Starting EHSAS API Tests...")
@@ -376,21 +765,29 @@ class EHSASAPITester:
         self.test_get_spotlight_alumni()
         self.test_get_events()
         self.test_get_alumni_directory()
+        self.test_concurrent_reads()
         
         # Alumni registration
         self.test_alumni_registration()
         
         # Admin authentication
+        self.test_login_rate_limit()
         if self.test_admin_login():
             # Admin-only endpoints
             self.test_admin_stats()
             self.test_admin_pending_alumni()
             self.test_admin_approve_alumni()
+            self.test_approval_compare_and_set()
             self.test_admin_notifications()
             
             # Test CRUD operations for dynamic content
             self.test_spotlight_crud()
             self.test_events_crud()
+            self.test_list_formats_and_compression()
+            self.test_delta_sync()
+            self.test_event_rsvp_concurrency()
+            self.test_event_edit_keeps_capacity()
+            self.test_image_upload()
         
         # Print summary
         print("\n" + "=" * 50)
@@ -1,4 +1,4 @@
-import { useState, useEffect } from "react";
+import { useState, useEffect, useRef } from "react";
 import { useNavigate, Link } from "react-router-dom";
 import axios from "axios";
 import { toast } from "sonner";
@@ -50,6 +50,28 @@ import {
 const API = `${process.env.REACT_APP_BACKEND_URL}/api`;
 const LOGO_URL = "https://customer-assets.emergentagent.com/job_elden-alumni/artifacts/0ansi0ti_LOGO-2.png";
 
+// The API returns a causal token on admin requests; sending the latest one back
+// lets reads served by a database secondary still include our own writes.
+let causalToken = null;
+axios.interceptors.response.use((res) => {
+  const token = res.headers["x-causal-token"];
+  if (token) causalToken = token;
+  return res;
+});
+const causalHeaders = () => (causalToken ? { "X-Causal-Token": causalToken } : {});
+
+// List endpoints given ?since= return only what changed; a cursor from before
+// the server's tombstone window gets a full snapshot flagged with reset.
+const FULL_SYNC = "1970-01-01T00:00:00Z";
+const applyDelta = (items, { changed, deleted, reset }) => {
+  if (reset) return changed;
+  const updates = new Map(changed.map((item) => [item.id, item]));
+  const removed = new Set(deleted);
+  const kept = items.filter((item) => !removed.has(item.id)).map((item) => updates.get(item.id) || item);
+  const known = new Set(kept.map((item) => item.id));
+  return [...kept, ...changed.filter((item) => !known.has(item.id))];
+};
+
 const AdminDashboard = () => {
   const navigate = useNavigate();
   const [stats, setStats] = useState(null);
@@ -67,12 +89,13 @@ const AdminDashboard = () => {
   const [editingEvent, setEditingEvent] = useState(null);
   const [activeTab, setActiveTab] = useState("pending");
   const [searchQuery, setSearchQuery] = useState("");
+  const syncCursors = useRef({});
 
   const [spotlightForm, setSpotlightForm] = useState({
     name: "", batch: "", profession: "", achievement: "", category: "corporate", image_url: ""
   });
   const [eventForm, setEventForm] = useState({
-    title: "", description: "", event_type: "reunion", date: "", time: "", location: "", image_url: ""
+    title: "", description: "", event_type: "reunion", date: "", time: "", location: "", image_url: "", capacity: ""
   });
 
   const token = localStorage.getItem("adminToken");
@@ -86,26 +109,34 @@ const AdminDashboard = () => {
   }, [token, navigate]);
 
   const getAuthHeaders = () => ({
-    headers: { Authorization: `Bearer ${token}` },
+    headers: { Authorization: `Bearer ${token}`, ...causalHeaders() },
+  });
+
+  // Repeated clicks reuse the same key, so the server replays the first result
+  const getIdempotentHeaders = (key) => ({
+    headers: { Authorization: `Bearer ${token}`, "Idempotency-Key": key, ...causalHeaders() },
   });
 
+  const syncList = async (path, setItems, config = {}) => {
+    const since = syncCursors.current[path] || FULL_SYNC;
+    const res = await axios.get(`${API}${path}`, { ...config, params: { since } });
+    syncCursors.current[path] = res.data.since;
+    setItems((items) => applyDelta(items, res.data));
+  };
+
   const fetchDashboardData = async () => {
     setLoading(true);
     try {
-      const [statsRes, pendingRes, allRes, notifRes, eventsRes, spotlightRes] = await Promise.all([
+      const [statsRes, notifRes] = await Promise.all([
         axios.get(`${API}/admin/stats`, getAuthHeaders()),
-        axios.get(`${API}/alumni/pending`, getAuthHeaders()),
-        axios.get(`${API}/alumni/all`, getAuthHeaders()),
         axios.get(`${API}/admin/notifications`, getAuthHeaders()),
-        axios.get(`${API}/events`),
-        axios.get(`${API}/spotlight`),
+        syncList("/alumni/pending", setPendingAlumni, getAuthHeaders()),
+        syncList("/alumni/all", setAllAlumni, getAuthHeaders()),
+        syncList("/events", setEvents),
+        syncList("/spotlight", setSpotlight),
       ]);
       setStats(statsRes.data);
-      setPendingAlumni(pendingRes.data);
-      setAllAlumni(allRes.data);
       setNotifications(notifRes.data);
-      setEvents(eventsRes.data);
-      setSpotlight(spotlightRes.data);
     } catch (err) {
       console.error("Error fetching dashboard data:", err);
       if (err.response?.status === 401) {
@@ -119,23 +150,23 @@ const AdminDashboard = () => {
 
   const handleApprove = async (alumniId) => {
     try {
-      const res = await axios.put(`${API}/alumni/${alumniId}/approve`, {}, getAuthHeaders());
+      const res = await axios.put(`${API}/alumni/${alumniId}/approve`, {}, getIdempotentHeaders(`approve-${alumniId}`));
       toast.success(res.data.message);
       fetchDashboardData();
       setShowDetailModal(false);
     } catch (err) {
-      toast.error("Failed to approve alumni");
+      toast.error(err.response?.data?.detail || "Failed to approve alumni");
     }
   };
 
   const handleReject = async (alumniId) => {
     try {
-      await axios.put(`${API}/alumni/${alumniId}/reject`, {}, getAuthHeaders());
+      await axios.put(`${API}/alumni/${alumniId}/reject`, {}, getIdempotentHeaders(`reject-${alumniId}`));
       toast.success("Alumni registration rejected");
       fetchDashboardData();
       setShowDetailModal(false);
     } catch (err) {
-      toast.error("Failed to reject alumni");
+      toast.error(err.response?.data?.detail || "Failed to reject alumni");
     }
   };
 
@@ -189,7 +220,7 @@ const AdminDashboard = () => {
   // Events CRUD
   const handleAddEvent = () => {
     setEditingEvent(null);
-    setEventForm({ title: "", description: "", event_type: "reunion", date: "", time: "", location: "", image_url: "" });
+    setEventForm({ title: "", description: "", event_type: "reunion", date: "", time: "", location: "", image_url: "", capacity: "" });
     setShowEventModal(true);
   };
 
@@ -202,24 +233,27 @@ const AdminDashboard = () => {
       date: item.date,
       time: item.time,
       location: item.location,
-      image_url: item.image_url || ""
+      image_url: item.image_url || "",
+      capacity: item.capacity ?? ""
     });
     setShowEventModal(true);
   };
 
   const handleSaveEvent = async () => {
+    // An empty capacity means unlimited seats
+    const payload = { ...eventForm, capacity: eventForm.capacity === "" ? null : Number(eventForm.capacity) };
     try {
       if (editingEvent) {
-        await axios.put(`${API}/events/${editingEvent.id}`, eventForm, getAuthHeaders());
+        await axios.put(`${API}/events/${editingEvent.id}`, payload, getAuthHeaders());
         toast.success("Event updated");
       } else {
-        await axios.post(`${API}/events`, eventForm, getAuthHeaders());
+        await axios.post(`${API}/events`, payload, getAuthHeaders());
         toast.success("Event created");
       }
       setShowEventModal(false);
       fetchDashboardData();
     } catch (err) {
-      toast.error("Failed to save event");
+      toast.error(err.response?.data?.detail || "Failed to save event");
     }
   };
 
@@ -695,6 +729,7 @@ const AdminDashboard = () => {
               <div><Label className="text-sm font-medium">Time *</Label><Input value={eventForm.time} onChange={(e) => setEventForm({...eventForm, time: e.target.value})} placeholder="e.g., 6:00 PM" className="rounded-none mt-1" data-testid="event-time" /></div>
             </div>
             <div><Label className="text-sm font-medium">Location *</Label><Input value={eventForm.location} onChange={(e) => setEventForm({...eventForm, location: e.target.value})} className="rounded-none mt-1" data-testid="event-location" /></div>
+            <div><Label className="text-sm font-medium">Capacity</Label><Input type="number" min="1" value={eventForm.capacity} onChange={(e) => setEventForm({...eventForm, capacity: e.target.value})} placeholder="Leave empty for unlimited seats" className="rounded-none mt-1" data-testid="event-capacity" /></div>
             <div><Label className="text-sm font-medium">Image URL</Label><Input value={eventForm.image_url} onChange={(e) => setEventForm({...eventForm, image_url: e.target.value})} placeholder="https://..." className="rounded-none mt-1" data-testid="event-image" /></div>
           </div>
           <DialogFooter>
@@ -51,7 +51,7 @@ const LandingPage = () => {
 
   const fetchEvents = async () => {
     try {
-      const res = await axios.get(`${API}/events`);
+      const res = await axios.get(`${API}/events`, { params: { upcoming: true, limit: 3 } });
       setEvents(res.data);
     } catch (err) {
       console.error("Error fetching events:", err);
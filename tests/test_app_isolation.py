@@ -0,0 +1,69 @@
+"""Apps built by create_app() must not share state, even when started one after another.
+
+Runs against the Mongo server in MONGO_URL, using a throwaway database per app.
+"""
+import io
+import sys
+import uuid
+from pathlib import Path
+
+import pymongo
+import pytest
+from fastapi.testclient import TestClient
+from PIL import Image
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+import server  # noqa: E402
+
+pytestmark = pytest.mark.skipif(not server.Settings().mongo_url, reason="MONGO_URL is not set")
+
+ADMIN_LOGIN = {"email": "deweshkk@gmail.com", "password": "Dew@2002k"}
+SPOTLIGHT = {"name": "Test Alumni", "batch": "2010", "profession": "Engineer", "achievement": "Test", "category": "Technology"}
+
+@pytest.fixture
+def make_app(tmp_path, monkeypatch):
+    monkeypatch.setattr(server, "UPLOAD_DIR", tmp_path / "uploads")
+    monkeypatch.setattr(server, "SPILL_DIR", tmp_path / "spill")
+    db_names = []
+    
+    def build():
+        settings = server.Settings(db_name=f"ehsas_test_{uuid.uuid4().hex[:12]}")
+        db_names.append(settings.db_name)
+        return server.create_app(settings)
+    
+    yield build
+    mongo = pymongo.MongoClient(server.Settings().mongo_url)
+    for name in db_names:
+        mongo.drop_database(name)
+    mongo.close()
+
+def admin_headers(client: TestClient) -> dict:
+    token = client.post("/api/auth/admin/login", json=ADMIN_LOGIN).json()["token"]
+    return {"Authorization": f"Bearer {token}"}
+
+def upload_image(client: TestClient, headers: dict):
+    buffer = io.BytesIO()
+    Image.new("RGB", (64, 64), (139, 28, 58)).save(buffer, "PNG")
+    return client.post("/api/uploads/images", files={"file": ("test.png", buffer.getvalue(), "image/png")}, headers=headers)
+
+def test_apps_started_one_after_another_are_isolated(make_app):
+    for created in (1, 2):
+        app = make_app()
+        with TestClient(app) as client:
+            headers = admin_headers(client)
+            for _ in range(created):
+                assert client.post("/api/spotlight", json=SPOTLIGHT, headers=headers).status_code == 200
+            
+            assert len(client.get("/api/spotlight").json()) == created
+            assert upload_image(client, headers).status_code == 201
+            services = app.state.runtime.lifecycle.services
+            assert services and not any(task.done() for task in services.values())
+
+def test_app_can_be_started_twice(make_app):
+    app = make_app()
+    for _ in range(2):
+        with TestClient(app) as client:
+            headers = admin_headers(client)
+            assert upload_image(client, headers).status_code == 201
+            client.post("/api/admin/digest/send", headers=headers).raise_for_status()
+            assert not app.state.runtime.lifecycle.services["digest"].done()
@@ -0,0 +1,55 @@
+"""Normalization and scoring used to flag likely duplicate registrations."""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+import server  # noqa: E402
+
+def registration(**overrides) -> dict:
+    alumni = {
+        "first_name": "Asha",
+        "last_name": "Verma",
+        "mobile": "98765 43210",
+        "year_of_leaving": 2015,
+        "last_house": "Red House",
+    }
+    return {**alumni, **overrides}
+
+def test_soundex_matches_spelling_variants():
+    assert server.soundex("Robert") == server.soundex("Rupert") == "R163"
+    assert server.soundex("Asha") == server.soundex("Aasha") == "A200"
+    assert server.soundex("Tymczak") == "T522"
+    assert server.soundex("") == ""
+
+def test_normalize_mobile_to_e164(monkeypatch):
+    monkeypatch.setattr(server, "DEFAULT_COUNTRY_CODE", "91")
+    assert server.normalize_mobile("98765 43210") == "+919876543210"
+    assert server.normalize_mobile("098765-43210") == "+919876543210"
+    assert server.normalize_mobile("+91 98765 43210") == "+919876543210"
+    assert server.normalize_mobile("0091 9876543210") == "+919876543210"
+    assert server.normalize_mobile("919876543210") == "+919876543210"
+
+def test_same_mobile_is_flagged_on_its_own():
+    score, reasons = server.duplicate_score(
+        registration(first_name="Ravi", last_name="Kumar", year_of_leaving=2012, last_house="Blue House"),
+        registration(mobile="+91 98765 43210")
+    )
+    assert "same mobile" in reasons
+    assert score >= server.DUPLICATE_SCORE_THRESHOLD
+
+def test_phonetic_name_with_same_batch_and_house_is_flagged():
+    score, reasons = server.duplicate_score(registration(mobile="9123456780"), registration(first_name="Aasha"))
+    assert {"same-sounding name", "same batch", "same house"} <= set(reasons)
+    assert "same mobile" not in reasons
+    assert score >= server.DUPLICATE_SCORE_THRESHOLD
+
+def test_different_people_are_not_flagged():
+    score, _ = server.duplicate_score(
+        registration(first_name="Rahul", last_name="Sharma", mobile="9123456780", last_house="Blue House"),
+        registration()
+    )
+    assert score < server.DUPLICATE_SCORE_THRESHOLD
+
+def test_blocking_keys_group_phonetic_variants():
+    keys = set(server.duplicate_blocking_keys(registration(first_name="Aasha", mobile="9123456780")))
+    assert keys & set(server.duplicate_blocking_keys(registration()))